@@ -0,0 +1,147 @@
+# this file finds a near-optimal allocation very quickly, with a proven bound on how far from the best it is
+# it is a fully polynomial approximation scheme: the benefits are scaled down to whole numbers and a dynamic
+# programming table over the scaled benefit finds the cheapest selection for every benefit. rounding the
+# benefits down loses at most epsilon times the best score, so the answer is at least (1 - epsilon) of it
+#
+# the benefit of a project is at most 10 (12.5 with the emergency bonus), so on a large portfolio the greedy
+# fill already is within one project of the linear programming bound, that proves the guarantee by itself
+# and the table is only needed for small portfolios
+
+# import the necessary libraries
+from typing import List, Tuple
+import numpy as np
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from project_set import ProjectSet
+from branch_and_bound import BranchAndBound, Solution
+
+# approximation class
+class Approximation:
+    # tolerance used when comparing scores, so rounding errors never claim a better guarantee
+    EPSILON = 1e-9
+
+    # static method to find a selection with at least (1 - epsilon) times the best possible score
+    # the solution reports the promised epsilon, and the linear programming bound as its upper bound,
+    # so solution.gap is the achieved distance to the best possible score (usually far below epsilon)
+    @staticmethod
+    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False,
+                       epsilon: float = 0.01) -> Solution:
+        if not 0 < epsilon < 1:
+            raise ValueError(f"Epsilon must be between 0 and 1. Current value: {epsilon}")
+
+        # the cost and the benefit (emergency bonus included) of every project
+        if isinstance(projects, ProjectSet):
+            costs = projects.costs
+            values = projects.values(emergency_mode)
+            projects = projects.views()
+        else:
+            costs = np.fromiter((project.cost for project in projects), dtype=float, count=len(projects))
+            values = np.fromiter((BranchAndBound._project_value(project, emergency_mode) for project in projects),
+                                 dtype=float, count=len(projects))
+
+        # the projects that fit the budget, in the order of the branch and bound (highest ratio first)
+        candidates = np.flatnonzero(costs <= budget)
+        ratios = np.divide(values[candidates], costs[candidates], out=np.zeros(len(candidates)),
+                           where=costs[candidates] > 0)
+        order = candidates[np.argsort(-ratios, kind="stable")]
+
+        greedy, lp_bound = Approximation._greedy(order, costs, values, budget)
+        greedy_value = values[greedy].sum()
+        selected = greedy
+        best_value = greedy_value
+
+        # the greedy fill is within epsilon of the bound, that already proves the guarantee
+        if greedy_value < (1 - epsilon) * lp_bound - Approximation.EPSILON:
+            scaled = Approximation._scaled_selection(order, costs, values, budget, epsilon, greedy_value)
+            scaled_value = values[scaled].sum()
+            if scaled_value > best_value:
+                selected = scaled
+                best_value = scaled_value
+
+        # only the selected projects are ordered, the rest of the portfolio is never sorted
+        selected = [projects[i] for i in selected.tolist()]
+        solution = BranchAndBound._build_solution(selected, {id(project) for project in selected}, emergency_mode)
+        solution.engine = "approximation"
+        solution.epsilon = epsilon
+        solution.preprocessing = {"oversized": len(projects) - len(candidates)}
+        # the selection is optimal only if it reaches the bound
+        if lp_bound > solution.objective + Approximation.EPSILON * max(lp_bound, 1):
+            solution.upper_bound = lp_bound
+            solution.is_optimal = False
+            solution.stop_reason = "approximation"
+        return solution
+
+    # static method to fill the budget greedily in the given order, taking every project that still fits
+    # returns the selected projects and the linear programming bound (the fill up to the first project that
+    # does not fit, plus the fraction of it that would)
+    @staticmethod
+    def _greedy(order: np.ndarray, costs: np.ndarray, values: np.ndarray, budget: float) -> Tuple[np.ndarray, float]:
+        filled = np.cumsum(costs[order])
+        fits = int(np.searchsorted(filled, budget, side="right"))
+        selected = [order[:fits]]
+        if fits == len(order):
+            return order, float(values[order].sum())
+
+        remaining = budget - (filled[fits - 1] if fits else 0)
+        break_project = order[fits]
+        lp_bound = float(values[order[:fits]].sum() + remaining * values[break_project] / costs[break_project])
+
+        # the projects after the first one that does not fit are still taken if they fit
+        rest = order[fits + 1:]
+        extra = []
+        for i in rest[costs[rest] <= remaining].tolist():
+            if costs[i] <= remaining:
+                extra.append(i)
+                remaining -= costs[i]
+        selected.append(np.array(extra, dtype=int))
+        return np.concatenate(selected), lp_bound
+
+    # static method to run the profit-scaling dynamic program
+    # every benefit is divided by scale and rounded down, a selection never has more projects than the
+    # cheapest projects that fit together, so rounding loses less than that many times scale, which is set to
+    # epsilon times a lower bound of the best score. table[p] is the lowest cost reaching a scaled benefit of p
+    @staticmethod
+    def _scaled_selection(order: np.ndarray, costs: np.ndarray, values: np.ndarray, budget: float,
+                          epsilon: float, greedy_value: float) -> np.ndarray:
+        # the best score is at least the greedy fill and at least the best single project
+        lower_bound = max(greedy_value, values[order].max())
+        if lower_bound <= 0:
+            return np.zeros(0, dtype=int)
+        most_projects = max(int(np.searchsorted(np.cumsum(np.sort(costs[order])), budget, side="right")), 1)
+        scale = epsilon * lower_bound / most_projects
+        profits = np.floor(values[order] / scale).astype(np.int64)
+
+        # a selection is worth at most twice the lower bound, so the table stops there
+        size = min(int(profits.sum()), int(2 * lower_bound / scale) + most_projects) + 1
+        table = np.full(size, np.inf)
+        table[0] = 0
+        keep = [None] * len(order)
+        for i, (cost, profit) in enumerate(zip(costs[order].tolist(), profits.tolist())):
+            if profit == 0 or profit >= size:
+                continue
+            candidate = table[:size - profit] + cost
+            improved = candidate < table[profit:]
+            table[profit:] = np.where(improved, candidate, table[profit:])
+            keep[i] = np.packbits(improved)
+
+        # the highest scaled benefit within the budget, then walk back through the kept bits
+        reachable = np.flatnonzero(table <= budget)
+        benefit = int(reachable[-1])
+        chosen = []
+        for i in range(len(order) - 1, -1, -1):
+            if keep[i] is None or profits[i] > benefit:
+                continue
+            bit = benefit - profits[i]
+            if (keep[i][bit >> 3] >> (7 - (bit & 7))) & 1:
+                chosen.append(int(order[i]))
+                benefit -= profits[i]
+
+        # the budget left is filled greedily, which can only add to the score
+        remaining = budget - costs[chosen].sum()
+        taken = set(chosen)
+        for i in order.tolist():
+            if i not in taken and costs[i] <= remaining:
+                chosen.append(i)
+                remaining -= costs[i]
+        return np.array(chosen, dtype=int)
@@ -0,0 +1,459 @@
+# this file measures how much time and memory the knapsack solver needs
+
+# import the necessary libraries
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from branch_and_bound import BranchAndBound, Node, PrefixTables
+from dynamic_programming import DynamicProgramming
+from parallel_branch_and_bound import ParallelBranchAndBound
+from core_knapsack import CoreKnapsack
+from meet_in_the_middle import MeetInTheMiddle
+from solver import Solver
+from portfolio_io import PortfolioIO
+
+# the categories a generated project can belong to
+CATEGORIES = ["Infrastructure", "Health", "Education",
+              "Environment", "Social Services", "Economic Development"]
+
+# generate a random list of projects, the seed makes the list reproducible
+def generate_projects(n, seed=0):
+    rng = random.Random(seed)
+    projects = []
+    for i in range(n):
+        cost = rng.randint(10, 500) * 1000.0
+        benefit = round(rng.uniform(0, 10), 2)
+        projects.append(Project(f"Project {i + 1}", cost, benefit, rng.choice(CATEGORIES)))
+    return projects
+
+# generate projects whose benefit grows with their cost, so every benefit-cost ratio is almost the same
+# these are hard for branch and bound because the bound prunes very little
+def generate_correlated_projects(n, seed=0):
+    rng = random.Random(seed)
+    projects = []
+    for i in range(n):
+        cost = rng.randint(100, 1000) * 1000.0
+        projects.append(Project(f"Project {i + 1}", cost, round(cost / 120000 + 0.5, 2), rng.choice(CATEGORIES)))
+    return projects
+
+# the shared randomized corpus: small portfolios in both modes with budgets between 10% and 90% of the total cost
+def random_corpus(trials=200, seed=0):
+    rng = random.Random(seed)
+    corpus = []
+    for trial in range(trials):
+        projects = generate_projects(rng.randint(1, 40), seed + trial)
+        emergency_mode = rng.random() < 0.5
+        emergency_type = rng.choice(["Typhoon", "Earthquake", "Flood", "Fire", "Health Crisis"])
+        for project in projects:
+            project.set_emergency_priority(emergency_mode, emergency_type)
+        budget = round(sum(p.cost for p in projects) * rng.uniform(0.1, 0.9), 2)
+        corpus.append((projects, budget, emergency_mode))
+    return corpus
+
+# check that the dynamic programming and the branch and bound agree on every instance of the corpus
+def cross_check_engines(trials=200, seed=0):
+    for projects, budget, emergency_mode in random_corpus(trials, seed):
+        bnb = BranchAndBound.solve_knapsack(projects, budget, emergency_mode)
+        dp = DynamicProgramming.solve_knapsack(projects, budget, emergency_mode)
+        # both engines maximize the objective (the benefit with the emergency bonus), equally good plans
+        # can have a different total benefit, it is only shown for information
+        if round(bnb.objective, 6) != round(dp.objective, 6):
+            raise AssertionError(f"Engines disagree on {len(projects)} projects, budget {budget}: "
+                                 f"objective {bnb.objective} vs {dp.objective} "
+                                 f"(total benefit {bnb.total_benefit} vs {dp.total_benefit})")
+    print(f"Branch and bound and dynamic programming agree on {trials} random portfolios")
+
+# check that the batch solve agrees with one solve per budget and never explores more nodes in total
+# the costs are floats, so the dynamic programming never takes over
+def cross_check_batch(trials=50, seed=0):
+    rng = random.Random(seed)
+    for trial in range(trials):
+        projects = [Project(f"Project {i + 1}", rng.uniform(1000, 100000), rng.uniform(1, 10), rng.choice(CATEGORIES))
+                    for i in range(rng.randint(1, 300))]
+        emergency_mode = rng.random() < 0.5
+        for project in projects:
+            project.set_emergency_priority(emergency_mode, "Typhoon")
+        total = sum(p.cost for p in projects)
+        budgets = [total * rng.uniform(0.05, 0.95) for _ in range(10)]
+        separate = [BranchAndBound.solve_knapsack(projects, budget, emergency_mode) for budget in budgets]
+        batch = BranchAndBound.solve_many(projects, budgets, emergency_mode)
+        for budget, one, many in zip(budgets, separate, batch):
+            if round(one.objective, 6) != round(many.objective, 6) or many.total_cost > budget:
+                raise AssertionError(f"Batch solve differs on {len(projects)} projects: "
+                                     f"{many.objective} vs {one.objective}")
+        separate_nodes = sum(solution.nodes_explored for solution in separate)
+        batch_nodes = sum(solution.nodes_explored for solution in batch)
+        if batch_nodes > separate_nodes:
+            raise AssertionError(f"Batch solve explored {batch_nodes} nodes against {separate_nodes} "
+                                 f"for separate solves on {len(projects)} projects")
+    print(f"Batch and separate solves agree on {trials} random portfolios, with no more nodes explored")
+
+# check that a hard portfolio under a short time limit still gets the exact answer of meet in the middle
+# every benefit is proportional to the cost, so every ratio is equal and the bound never prunes
+def check_meeting_fallback(n=40, time_limit=1.0, seed=0):
+    rng = random.Random(seed)
+    projects = []
+    for i in range(n):
+        cost = rng.uniform(100_000, 1_000_000)
+        projects.append(Project(f"Project {i + 1}", cost, cost / 100_000, rng.choice(CATEGORIES)))
+    budget = sum(p.cost for p in projects) / 2
+
+    solution = Solver.solve_knapsack(projects, budget, time_limit=time_limit, strategy="hybrid")
+    exact = MeetInTheMiddle.solve_knapsack(projects, budget)
+    if not solution.is_optimal or round(solution.objective, 6) != round(exact.objective, 6):
+        raise AssertionError(f"Correlated portfolio of {n} projects under a {time_limit} s limit: "
+                             f"{solution.objective} ({solution.engine}, {solution.stop_reason or 'optimal'}) "
+                             f"vs {exact.objective}")
+    print(f"Correlated portfolio of {n} projects solved exactly by {solution.engine} under a {time_limit} s limit")
+
+# check that a json lines import rejects the rows whose cost or benefit is not a number, booleans included
+def check_jsonl_import():
+    lines = [
+        {"name": "Road", "cost": 500000, "benefit": 7, "category": "Infrastructure"},
+        {"name": "Clinic", "cost": True, "benefit": 8, "category": "Health"},
+        {"name": "School", "cost": 300000, "benefit": False, "category": "Education"},
+        {"name": "Well", "cost": "12000.50", "benefit": "4", "category": "Water"},
+        {"name": "Bridge", "cost": "a lot", "benefit": 9, "category": "Infrastructure"},
+    ]
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "portfolio.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write("\n".join(json.dumps(line) for line in lines) + "\n")
+        result = PortfolioIO.import_projects(path)
+
+    expected_errors = [(2, "Cost is not a number."), (3, "Benefit score is not a number."), (5, "Cost is not a number.")]
+    if [project.name for project in result.projects] != ["Road", "Well"] or sorted(result.errors) != expected_errors:
+        raise AssertionError(f"JSON lines import kept {[project.name for project in result.projects]} "
+                             f"with the errors {result.errors}")
+    print("JSON lines import rejects booleans and other values that are not numbers")
+
+# solve once and record the wall time and the peak memory used during the solve
+def measure_peak_memory(projects, budget, emergency_mode=False):
+    tracemalloc.start()
+    start = time.perf_counter()
+    solution = BranchAndBound.solve_knapsack(projects, budget, emergency_mode)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return solution, elapsed, peak
+
+# run the memory benchmark on a few portfolio sizes
+def run_memory_benchmark(sizes=(50, 100, 200, 400), seed=0):
+    print(f"{'Projects':>10} {'Time (s)':>10} {'Peak memory':>14} {'Nodes':>10} {'Peak queue':>12}")
+    for n in sizes:
+        projects = generate_projects(n, seed)
+        # use about a third of the total cost as the budget
+        budget = sum(p.cost for p in projects) / 3
+        solution, elapsed, peak = measure_peak_memory(projects, budget)
+        print(f"{n:>10} {elapsed:>10.3f} {peak / 1024:>11.1f} KB {solution.nodes_explored:>10} {solution.peak_queue_size:>12}")
+
+# count how many times a bound function can be evaluated per second on the given nodes
+def _evaluations_per_second(bound_function, nodes, min_time=0.5):
+    evaluations = 0
+    start = time.perf_counter()
+    elapsed = 0
+    while elapsed < min_time:
+        for node in nodes:
+            bound_function(node)
+        evaluations += len(nodes)
+        elapsed = time.perf_counter() - start
+    return evaluations / elapsed
+
+# compare the prefix-sum bound against the original linear loop
+def run_bound_benchmark(sizes=(100, 1000, 10000), samples=200, seed=0):
+    print(f"{'Projects':>10} {'Loop (evals/s)':>16} {'Prefix (evals/s)':>18} {'Speedup':>9}")
+    rng = random.Random(seed)
+    for n in sizes:
+        projects = BranchAndBound._sort_projects(generate_projects(n, seed), False)
+        budget = sum(p.cost for p in projects) / 3
+        tables = PrefixTables(projects, False)
+        
+        # random nodes spread over the whole tree, the weight is kept under the budget
+        nodes = []
+        for _ in range(samples):
+            level = rng.randint(-1, n - 1)
+            nodes.append(Node(level, rng.uniform(0, 10 * n / 3), rng.uniform(0, budget)))
+        
+        loop_rate = _evaluations_per_second(
+            lambda node: BranchAndBound._calculate_bound_linear(node, projects, budget, False), nodes)
+        prefix_rate = _evaluations_per_second(
+            lambda node: BranchAndBound._calculate_bound(node, tables, budget), nodes)
+        print(f"{n:>10} {loop_rate:>16,.0f} {prefix_rate:>18,.0f} {prefix_rate / loop_rate:>8.1f}x")
+
+# compare the nodes explored with and without the preprocessing stage
+def run_preprocessing_benchmark(n=500, seeds=(0, 1, 2, 3, 4)):
+    print(f"{'Seed':>6} {'Nodes (plain)':>14} {'Nodes (preprocessed)':>21}  Removed by step")
+    for seed in seeds:
+        projects = generate_projects(n, seed)
+        budget = sum(p.cost for p in projects) / 3
+        plain = BranchAndBound.solve_knapsack(projects, budget, preprocess=False)
+        reduced = BranchAndBound.solve_knapsack(projects, budget)
+        removed = ", ".join(f"{step}: {count}" for step, count in reduced.preprocessing.items())
+        print(f"{seed:>6} {plain.nodes_explored:>14} {reduced.nodes_explored:>21}  {removed}")
+
+# time the parallel solver with more and more workers on a hard portfolio
+def run_parallel_benchmark(n=60, worker_counts=(1, 2, 4, 8, 16), seed=0):
+    projects = generate_correlated_projects(n, seed)
+    budget = sum(p.cost for p in projects) / 2
+
+    start = time.perf_counter()
+    serial = BranchAndBound.solve_knapsack(projects, budget)
+    serial_time = time.perf_counter() - start
+    print(f"{'Workers':>8} {'Time (s)':>10} {'Speedup':>9} {'Nodes':>10}  Matches serial")
+    print(f"{'serial':>8} {serial_time:>10.3f} {1:>8.2f}x {serial.nodes_explored:>10}")
+
+    for workers in worker_counts:
+        start = time.perf_counter()
+        solution = ParallelBranchAndBound.solve_knapsack(projects, budget, workers=workers)
+        elapsed = time.perf_counter() - start
+        # tied selections can differ between the engines, only the objective has to match
+        matches = round(solution.objective, 6) == round(serial.objective, 6)
+        print(f"{workers:>8} {elapsed:>10.3f} {serial_time / elapsed:>8.2f}x {solution.nodes_explored:>10}  {matches}")
+
+# compare solving a whole range of budgets at once against one solve per budget
+def run_scenario_benchmark(n=1000, seed=0):
+    projects = generate_projects(n, seed)
+    budgets = [1_000_000 + 500_000 * i for i in range(19)]    # ₱1M, ₱1.5M, ... ₱10M
+    print(f"{'Engine':>20} {'Separate (s)':>13} {'Batch (s)':>10} {'Speedup':>9}")
+
+    for name, solve, solve_many in (
+            ("dispatcher", Solver.solve_knapsack, Solver.solve_many),
+            ("branch and bound", BranchAndBound.solve_knapsack, BranchAndBound.solve_many),
+            ("dynamic programming", DynamicProgramming.solve_knapsack, DynamicProgramming.solve_many)):
+        start = time.perf_counter()
+        separate = [solve(projects, budget) for budget in budgets]
+        separate_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batch = solve_many(projects, budgets)
+        batch_time = time.perf_counter() - start
+
+        for one, many in zip(separate, batch):
+            if round(one.objective, 6) != round(many.objective, 6):
+                raise AssertionError(f"{name}: batch result differs from a separate solve")
+        print(f"{name:>20} {separate_time:>13.3f} {batch_time:>10.3f} {separate_time / batch_time:>8.1f}x")
+
+# time the core engine against the full branch and bound on large portfolios, the core time should grow
+# about as fast as the number of projects
+def run_core_benchmark(sizes=(10_000, 100_000, 1_000_000), seed=0, time_limit=30):
+    print(f"{'Projects':>10} {'Core (s)':>9} {'Core size':>10} {'B&B (s)':>9}  Same objective")
+    for n in sizes:
+        projects = generate_projects(n, seed)
+        budget = sum(p.cost for p in projects) / 3
+
+        start = time.perf_counter()
+        core = CoreKnapsack.solve_knapsack(projects, budget, time_limit=time_limit)
+        core_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        full = BranchAndBound.solve_knapsack(projects, budget, time_limit=time_limit)
+        full_time = time.perf_counter() - start
+        same = round(core.objective, 6) == round(full.objective, 6) if core.is_optimal and full.is_optimal else "n/a"
+        print(f"{n:>10} {core_time:>9.3f} {core.preprocessing.get('core', 0):>10} {full_time:>9.3f}  {same}")
+
+# the instance families of the benchmark suite, from easy to hard for the branch and bound
+# the budget of every instance is half of the total cost
+INSTANCE_FAMILIES = ("uncorrelated", "weakly_correlated", "strongly_correlated", "subset_sum", "emergency_heavy")
+# the costs are whole thousands between these two
+MIN_COST = 10_000
+MAX_COST = 1_000_000
+
+# generate one instance of a family, the seed makes it reproducible
+# returns the projects and whether the instance is solved in emergency mode
+def generate_instance(family, n, seed=0):
+    rng = random.Random(f"{family}-{n}-{seed}")
+    emergency_mode = family == "emergency_heavy"
+    projects = []
+    for i in range(n):
+        cost = rng.randint(MIN_COST // 1000, MAX_COST // 1000) * 1000.0
+        scaled = 10 * cost / MAX_COST    # the cost on the 0-10 benefit scale
+        if family == "weakly_correlated":
+            # the benefit follows the cost with some noise
+            benefit = scaled + rng.uniform(-1, 1)
+        elif family == "strongly_correlated":
+            # the benefit is the cost plus a fixed amount, the classic hard case
+            benefit = 0.9 * scaled + 1
+        elif family == "subset_sum":
+            # every project has the same ratio, only filling the budget exactly matters
+            benefit = scaled
+        else:
+            benefit = rng.uniform(0, 10)
+        benefit = min(max(round(benefit, 4), 0), 10)
+
+        # most of the emergency-heavy projects are in the sectors an emergency puts first
+        if emergency_mode:
+            category = rng.choice(CATEGORIES[:2] * 3 + CATEGORIES[2:])
+        else:
+            category = rng.choice(CATEGORIES)
+        projects.append(Project(f"Project {i + 1}", cost, benefit, category))
+
+    if emergency_mode:
+        emergency_type = rng.choice(["Typhoon", "Earthquake", "Flood", "Fire", "Health Crisis"])
+        for project in projects:
+            project.set_emergency_priority(True, emergency_type)
+    return projects, emergency_mode
+
+# the peak resident memory of this process in kilobytes, None where the resource module is missing (windows)
+# on linux it is read from /proc, ru_maxrss keeps the peak of the parent across the exec of a spawned process
+def _peak_rss_kb():
+    try:
+        with open("/proc/self/status") as file:
+            for line in file:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # linux reports kilobytes, macos reports bytes
+    return peak // 1024 if platform.system() == "Darwin" else peak
+
+# run one case of the suite, this runs in its own spawned process so the peak memory belongs to this case only
+# (a forked process would start with the peak memory of the parent)
+def _run_case(family, n, seed, time_limit, strategy, bound="dantzig"):
+    projects, emergency_mode = generate_instance(family, n, seed)
+    budget = sum(p.cost for p in projects) / 2
+    start = time.perf_counter()
+    solution = BranchAndBound.solve_knapsack(projects, budget, emergency_mode,
+                                             time_limit=time_limit, strategy=strategy, bound=bound)
+    elapsed = time.perf_counter() - start
+    return {
+        "family": family,
+        "n": n,
+        "seed": seed,
+        "bound": bound,
+        "budget": budget,
+        "emergency_mode": emergency_mode,
+        "time_s": elapsed,
+        "nodes_explored": solution.nodes_explored,
+        "nodes_pruned": solution.nodes_pruned,
+        "peak_queue_size": solution.peak_queue_size,
+        "peak_rss_kb": _peak_rss_kb(),
+        "objective": solution.objective,
+        "is_optimal": solution.is_optimal,
+        "stop_reason": solution.stop_reason,
+    }
+
+# the commit the benchmark ran on, so result files can be matched to the code
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+# run every family at every size and write the results to a json file
+# every case runs in a fresh spawned process, a case that hits the time limit is recorded with is_optimal false
+# every instance is solved once per bound, their time and nodes are printed side by side
+def run_suite(sizes=(10, 100, 1000, 10000), families=INSTANCE_FAMILIES, seeds=(0,), time_limit=30,
+              strategy="hybrid", output="benchmark_results.json", bounds=BranchAndBound.BOUNDS):
+    header = f"{'Family':>20} {'Projects':>9}"
+    for bound in bounds:
+        header += f" {bound + ' (s)':>19} {'Nodes':>10}"
+    print(f"{header} {'Peak RSS':>11}  Optimal")
+    results = []
+    with multiprocessing.get_context("spawn").Pool(processes=1, maxtasksperchild=1) as pool:
+        for family in families:
+            for n in sizes:
+                for seed in seeds:
+                    cases = [pool.apply(_run_case, (family, n, seed, time_limit, strategy, bound)) for bound in bounds]
+                    results.extend(cases)
+                    row = f"{family:>20} {n:>9}"
+                    for case in cases:
+                        row += f" {case['time_s']:>19.3f} {case['nodes_explored']:>10}"
+                    peak = max((case["peak_rss_kb"] for case in cases if case["peak_rss_kb"] is not None), default=None)
+                    rss = f"{peak / 1024:.1f} MB" if peak is not None else "n/a"
+                    print(f"{row} {rss:>11}  {', '.join(str(case['is_optimal']) for case in cases)}")
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time_limit": time_limit,
+        "strategy": strategy,
+        "bounds": list(bounds),
+        "results": results,
+    }
+    with open(output, "w") as file:
+        json.dump(report, file, indent=2)
+    print(f"Results written to {output}")
+    return report
+
+# compare two result files and print the change of every case, slower cases are marked
+def compare_results(old_path, new_path, threshold=1.10):
+    with open(old_path) as file:
+        old = json.load(file)
+    with open(new_path) as file:
+        new = json.load(file)
+    # files written before the bound could be chosen only used the dantzig bound
+    old_cases = {(case["family"], case["n"], case["seed"], case.get("bound", "dantzig")): case for case in old["results"]}
+
+    print(f"Comparing {old.get('commit')} -> {new.get('commit')}")
+    print(f"{'Family':>20} {'Projects':>9} {'Bound':>14} {'Old (s)':>9} {'New (s)':>9} {'Ratio':>7} {'Nodes ratio':>12}")
+    regressions = 0
+    for case in new["results"]:
+        bound = case.get("bound", "dantzig")
+        before = old_cases.get((case["family"], case["n"], case["seed"], bound))
+        if before is None:
+            continue
+        ratio = case["time_s"] / before["time_s"] if before["time_s"] > 0 else 1
+        nodes_ratio = case["nodes_explored"] / before["nodes_explored"] if before["nodes_explored"] else 1
+        mark = "  slower" if ratio > threshold else ""
+        regressions += ratio > threshold
+        print(f"{case['family']:>20} {case['n']:>9} {bound:>14} {before['time_s']:>9.3f} {case['time_s']:>9.3f} "
+              f"{ratio:>6.2f}x {nodes_ratio:>11.2f}x{mark}")
+    print(f"{regressions} case(s) more than {threshold - 1:.0%} slower")
+    return regressions
+
+# main function
+# without arguments every benchmark runs, --suite only runs the instance families and writes the json file,
+# --compare prints the difference between two json files
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks for the budget allocation solver")
+    parser.add_argument("--suite", metavar="OUTPUT", help="run the benchmark suite and write the results to OUTPUT")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--time-limit", type=float, default=30)
+    parser.add_argument("--bounds", nargs="+", choices=BranchAndBound.BOUNDS, default=list(BranchAndBound.BOUNDS),
+                        help="the upper bounds the suite compares")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare_results(*args.compare)
+        return
+    if args.suite:
+        run_suite(sizes=args.sizes, time_limit=args.time_limit, output=args.suite, bounds=args.bounds)
+        return
+
+    run_memory_benchmark()
+    print()
+    run_bound_benchmark()
+    print()
+    run_preprocessing_benchmark()
+    print()
+    run_scenario_benchmark()
+    print()
+    run_core_benchmark()
+    print()
+    run_parallel_benchmark()
+    print()
+    cross_check_engines()
+    cross_check_batch()
+    check_meeting_fallback()
+    check_jsonl_import()
+
+if __name__ == "__main__":
+    main()
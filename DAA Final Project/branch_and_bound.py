@@ -2,25 +2,73 @@
 
 # import the necessary libraries
 import heapq
-from typing import List
+import time
+from bisect import bisect_right
+from typing import Callable, List, Optional
+import numpy as np
 
 # import the project class from project.py (must be in the same directory as this file)
 from project import Project
+from project_set import ProjectSet
+from preprocessing import Preprocessor, PreprocessResult
+from solver_stats import SolveStats
 
 # node solution, this will represent a state in the search tree
+# the node does not keep a copy of the whole selection, it only remembers its parent
+# and whether the project at its level was taken, so every node costs O(1) memory
 class Node:
-    # initialize a node    
-    def __init__(self, level, profit, weight, selected):
+    __slots__ = ('level', 'profit', 'weight', 'bound', 'parent', 'taken')
+
+    # initialize a node
+    def __init__(self, level, profit, weight, parent=None, taken=False):
         self.level = level
         self.profit = profit
         self.weight = weight
         self.bound = 0
-        self.selected = selected.copy()
+        self.parent = parent
+        self.taken = taken
     
     def __lt__(self, other):
         # for priority queue, higher bound means higher priority
         return self.bound > other.bound
 
+    # rebuild the full selection by walking back to the root, only done for the incumbent
+    def selection(self, n):
+        selected = [False] * n
+        node = self
+        while node is not None and node.level >= 0:
+            if node.taken:
+                selected[node.level] = True
+            node = node.parent
+        return selected
+
+# prefix tables, these hold the running totals of cost and benefit over the sorted projects
+# so the bound of a node can be found with a binary search instead of a loop
+class PrefixTables:
+    __slots__ = ('costs', 'values', 'cum_cost', 'cum_value')
+
+    # build the tables once per solve
+    def __init__(self, sorted_projects, emergency_mode):
+        self.costs = [project.cost for project in sorted_projects]
+        self.values = [BranchAndBound._project_value(project, emergency_mode) for project in sorted_projects]
+        # cum_cost[i] is the total cost of the first i projects, same for cum_value
+        self.cum_cost = [0] * (len(sorted_projects) + 1)
+        self.cum_value = [0] * (len(sorted_projects) + 1)
+        for i in range(len(sorted_projects)):
+            self.cum_cost[i + 1] = self.cum_cost[i] + self.costs[i]
+            self.cum_value[i + 1] = self.cum_value[i] + self.values[i]
+
+    # static method to build the tables straight from cost and value arrays in search order
+    # the sums are done by numpy, the tables are kept as lists since the search reads them one number at a time
+    @staticmethod
+    def from_arrays(costs, values) -> "PrefixTables":
+        tables = PrefixTables([], False)
+        tables.costs = costs.tolist()
+        tables.values = values.tolist()
+        tables.cum_cost = [0] + np.cumsum(costs).tolist()
+        tables.cum_value = [0] + np.cumsum(values).tolist()
+        return tables
+
 # solution class, this will hold the final results of the optimization
 class Solution:
     # initialize the solution, as well as it's other properties to be considered
@@ -29,41 +77,341 @@ class Solution:
         self.total_cost = 0
         self.total_benefit = 0
         self.efficiency = 0
+        # the benefit score the search maximized (emergency bonus included) and the best possible score
+        # when the search was stopped early, the difference between the two is the optimality gap
+        self.objective = 0
+        self.upper_bound = 0
+        self.is_optimal = True
+        self.stop_reason = ""
+        # the engine that produced the solution
+        self.engine = ""
+        # search statistics, useful to compare memory usage between runs
+        self.nodes_explored = 0
+        self.nodes_pruned = 0
+        self.peak_queue_size = 0
+        # how many projects each preprocessing step removed from the search
+        self.preprocessing = {}
+        # the SolveStats of the solve, only when the caller asked for them
+        self.stats = None
+        # for an approximate solve, the objective is at least (1 - epsilon) times the best possible score
+        self.epsilon = None
+        # the best selections of a top_k solve, best first, this solution is the first of them
+        # they share the search statistics, and their upper bound is the bound of the best selection
+        self.alternatives = []
+
+    # how far the objective is from the upper bound, as a share of the bound (0 when proven optimal)
+    @property
+    def gap(self) -> float:
+        return self.upper_bound > 0 and (self.upper_bound - self.objective) / self.upper_bound or 0
+
+# search result class, this holds what a single run of the search loop found
+class SearchResult:
+    # initialize the result
+    def __init__(self):
+        self.best_node = None       # the node with the best profit, None if nothing beat the starting profit
+        self.best_nodes = []        # with top_k, the nodes of the best selections, best first
+        self.max_profit = 0
+        self.nodes_explored = 0
+        self.nodes_pruned = 0       # nodes dropped because their bound could not beat the best profit
+        self.peak_queue_size = 0
+        self.stop_reason = ""       # empty if the search ran to the end
+        self.remaining_bound = 0    # best bound among the nodes left unexplored
 
 # algorithmic approach class
 class BranchAndBound:
+    # how many nodes to explore between two looks at the clock
+    TIME_CHECK_INTERVAL = 256
+    # at most how often (in seconds) on_progress is called
+    PROGRESS_INTERVAL = 0.1
+    # the search strategies that can be chosen
+    STRATEGIES = ("best_first", "dfs", "hybrid")
+    # default number of live nodes the hybrid strategy keeps before switching to depth-first
+    HYBRID_QUEUE_LIMIT = 200_000
+    # the upper bounds that can be chosen
+    BOUNDS = ("dantzig", "martello_toth")
+
     # static method to solve the knapsack problem using branch and bound
+    # time_limit (seconds) and max_nodes stop the search early, the best selection found so far is returned
+    # on_incumbent(objective, upper_bound, nodes_explored) is called every time a better selection is found
+    # on_progress gets the same values every PROGRESS_INTERVAL seconds, should_stop() cancels the search when true
+    # preprocess runs the heuristics and reductions in preprocessing.py before branching
+    # strategy is one of STRATEGIES:
+    #   "best_first" always expands the node with the highest bound, fewest nodes but the queue can grow very large
+    #   "dfs" goes deep first (include branch first), the stack never holds more than about 2n nodes
+    #   "hybrid" runs best-first until the queue holds max_queue_size nodes, then continues depth-first
+    # projects can also be a ProjectSet, it is then sorted and tabled on its arrays and the selected
+    # projects of the solution are ProjectView objects
+    # stats is an optional SolveStats, it is filled with counters and the time spent in every phase
+    # bound is one of BOUNDS:
+    #   "dantzig" fills the budget greedily and adds a fraction of the first project that does not fit
+    #   "martello_toth" is the tighter U2 bound, it is only worked out when the dantzig bound fails to prune
+    # approximate skips the search and returns a selection worth at least (1 - epsilon) times the best score
+    # from approximation.py, the limits, callbacks and search options do not apply to it
+    # top_k > 1 finds the top_k best selections (with a benefit above 0) in the same search, they are in
+    # solution.alternatives. the preprocessing only keeps the best selection, so it is skipped. selections
+    # with the same score and cost count once, and every alternative after the best has is_optimal false
     @staticmethod
     # Solve the knapsack problem with emergency mode support
-    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False) -> Solution:
-        # sort the projects based on benefit-cost ratio and emergency priority
-        sorted_projects = BranchAndBound._sort_projects(projects, emergency_mode)
+    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False,
+                       time_limit: Optional[float] = None, max_nodes: Optional[int] = None,
+                       on_incumbent: Optional[Callable[[float, float, int], None]] = None,
+                       preprocess: bool = True, strategy: str = "best_first",
+                       max_queue_size: Optional[int] = None,
+                       on_progress: Optional[Callable[[float, float, int], None]] = None,
+                       should_stop: Optional[Callable[[], bool]] = None,
+                       stats: Optional[SolveStats] = None, bound: str = "dantzig",
+                       approximate: bool = False, epsilon: float = 0.01, top_k: int = 1) -> Solution:
+        if approximate:
+            # imported here since approximation.py builds its solutions with this class
+            from approximation import Approximation
+            with SolveStats.phase_of(stats, "approximation"):
+                solution = Approximation.solve_knapsack(projects, budget, emergency_mode, epsilon)
+            solution.stats = stats
+            return solution
+        if strategy not in BranchAndBound.STRATEGIES:
+            raise ValueError(f"Unknown search strategy: {strategy}. Choose from {', '.join(BranchAndBound.STRATEGIES)}.")
+        if bound not in BranchAndBound.BOUNDS:
+            raise ValueError(f"Unknown bound: {bound}. Choose from {', '.join(BranchAndBound.BOUNDS)}.")
+        
+        # sort the projects by their benefit-cost ratio (emergency bonus included) so the bound stays valid
+        project_set = projects if isinstance(projects, ProjectSet) else None
+        with SolveStats.phase_of(stats, "sort"):
+            if project_set is not None:
+                # the solve works on one list of views, so a project is the same object from start to end
+                projects = project_set.views()
+                set_values = project_set.values(emergency_mode)
+                order = project_set.search_order(emergency_mode)
+                sorted_projects = [projects[i] for i in order.tolist()]
+                project_values = set_values[order].tolist()
+            else:
+                sorted_projects = BranchAndBound._search_order(projects, emergency_mode)
+                project_values = None
         
         # if there are no projects, return an empty solution
-        n = len(sorted_projects)
-        if n == 0:
+        if not sorted_projects:
             return Solution()
         
-        # priority queue for the nodes
-        pq = []
+        # shrink the problem first, this gives a starting incumbent and decides some projects already
+        with SolveStats.phase_of(stats, "preprocess"):
+            reduction = BranchAndBound._reduce(sorted_projects, budget, emergency_mode, preprocess and top_k == 1,
+                                               project_values)
+        
+        # the search only decides the free projects, with the budget left after the fixed ones
+        # for alternatives a project worth nothing is left out, it would only add copies of the same plan
+        search_projects = reduction.free_projects
+        if top_k > 1:
+            search_projects = [project for project in search_projects
+                               if BranchAndBound._project_value(project, emergency_mode) > 0]
+        n = len(search_projects)
+        fixed_value = sum(BranchAndBound._project_value(project, emergency_mode) for project in reduction.fixed_projects)
+        search_budget = budget - sum(project.cost for project in reduction.fixed_projects)
+        
+        # precompute the cost and benefit tables used by every bound
+        with SolveStats.phase_of(stats, "tables"):
+            if project_set is not None:
+                free = [project.index for project in search_projects]
+                tables = PrefixTables.from_arrays(project_set.costs[free], set_values[free])
+            else:
+                tables = PrefixTables(search_projects, emergency_mode)
         
         # initialize the root node
         # level -1 means no project has been considered yet
-        # profit and weight are both 0, and selected is a list of False
-        root = Node(-1, 0, 0, [False] * n)
-        # calculate the bound and push it in the priorite queue
-        root.bound = BranchAndBound._calculate_bound(root, sorted_projects, budget, emergency_mode)
-        heapq.heappush(pq, root)
+        # profit and weight are both 0, and it has no parent
+        root = Node(-1, 0, 0)
+        root.bound = BranchAndBound._bound_function(bound)(root, tables, search_budget,
+                                                           reduction.incumbent_value - fixed_value)
         
-        # initialize the max profit and best selection
-        max_profit = 0
-        best_selection = [False] * n
+        # search with the incumbent from the heuristics as the profit to beat
+        with SolveStats.phase_of(stats, "search"):
+            result = BranchAndBound._search(root, tables, search_budget, reduction.incumbent_value - fixed_value,
+                                            strategy, max_queue_size, time_limit, max_nodes, on_incumbent, fixed_value,
+                                            on_progress=on_progress, should_stop=should_stop, stats=stats, bound=bound,
+                                            top_k=top_k)
+        
+        # build the solution, the selection is only rebuilt for the best node (or the top_k best nodes)
+        # only the chosen projects are sorted, so the alternatives do not sort the whole portfolio again
+        with SolveStats.phase_of(stats, "build"):
+            positions = {id(project): i for i, project in enumerate(projects)}
+            solutions = []
+            for node in result.best_nodes or [result.best_node]:
+                if node is not None:
+                    selection = node.selection(n)
+                    chosen = reduction.fixed_projects + [search_projects[i] for i in range(n) if selection[i]]
+                else:
+                    chosen = reduction.incumbent
+                solutions.append(BranchAndBound._build_chosen(chosen, positions, emergency_mode))
+        solution = solutions[0]
+        
+        # if the search was stopped, the best bound still unexplored is on one of the live nodes
+        remaining_bound = result.remaining_bound + fixed_value
+        stopped = result.stop_reason and remaining_bound > solution.objective
+        upper_bound = remaining_bound if stopped else solution.objective
+        for alternative in solutions:
+            alternative.stats = stats
+            alternative.engine = "branch_and_bound"
+            alternative.nodes_explored = result.nodes_explored
+            alternative.nodes_pruned = result.nodes_pruned
+            alternative.peak_queue_size = result.peak_queue_size
+            alternative.preprocessing = dict(reduction.removed)
+            alternative.upper_bound = upper_bound
+            if stopped:
+                alternative.is_optimal = False
+                alternative.stop_reason = result.stop_reason
+            if alternative is not solution:
+                alternative.is_optimal = False
+        if top_k > 1:
+            solution.alternatives = solutions
+        return solution
+    
+    # static method to solve the knapsack problem for several budgets as a warm-started series
+    # the projects are sorted and their values computed once, then the budgets are solved from the smallest up
+    # with the same preprocessing as a single solve. the best selection for a smaller budget still fits a
+    # larger one, so it is the incumbent to beat whenever it is better than the heuristic one, and the
+    # reduced-cost test fixes more projects against it
+    @staticmethod
+    def solve_many(projects: List[Project], budgets: List[float], emergency_mode: bool = False) -> List[Solution]:
+        if isinstance(projects, ProjectSet):
+            projects = projects.views()
+        sorted_projects = BranchAndBound._search_order(projects, emergency_mode)
+        values = [BranchAndBound._project_value(project, emergency_mode) for project in sorted_projects]
+        value_of = {id(project): value for project, value in zip(sorted_projects, values)}
+        positions = {id(project): i for i, project in enumerate(projects)}
+        dominating_costs = Preprocessor.dominating_costs(sorted_projects, values)
+        
+        solutions = [None] * len(budgets)
+        previous = []    # the best selection for the previous budget
+        previous_value = 0
+        for index in sorted(range(len(budgets)), key=lambda i: budgets[i]):
+            budget = budgets[index]
+            # the previous optimum leaves some of the larger budget unused, it is filled greedily in ratio order
+            remaining = budget - sum(project.cost for project in previous)
+            taken = {id(project) for project in previous}
+            previous = list(previous)
+            for project, value in zip(sorted_projects, values):
+                if project.cost <= remaining and id(project) not in taken:
+                    previous.append(project)
+                    previous_value += value
+                    remaining -= project.cost
+            reduction = Preprocessor.reduce(sorted_projects, values, budget, previous, previous_value,
+                                            dominating_costs)
+            
+            # the search only decides the free projects, with the budget left after the fixed ones
+            free = reduction.free_projects
+            n = len(free)
+            fixed_value = sum(value_of[id(project)] for project in reduction.fixed_projects)
+            search_budget = budget - sum(project.cost for project in reduction.fixed_projects)
+            tables = PrefixTables.from_arrays(np.array([project.cost for project in free], dtype=float),
+                                              np.array([value_of[id(project)] for project in free], dtype=float))
+            
+            root = Node(-1, 0, 0)
+            root.bound = BranchAndBound._calculate_bound(root, tables, search_budget)
+            result = BranchAndBound._search(root, tables, search_budget, reduction.incumbent_value - fixed_value)
+            if result.best_node is not None:
+                selection = result.best_node.selection(n)
+                chosen = reduction.fixed_projects + [free[i] for i in range(n) if selection[i]]
+            else:
+                chosen = reduction.incumbent
+            
+            solution = BranchAndBound._build_chosen(chosen, positions, emergency_mode)
+            solution.engine = "branch_and_bound"
+            solution.nodes_explored = result.nodes_explored
+            solution.nodes_pruned = result.nodes_pruned
+            solution.peak_queue_size = result.peak_queue_size
+            solution.preprocessing = dict(reduction.removed)
+            solutions[index] = solution
+            previous = chosen
+            previous_value = solution.objective
+        return solutions
+    
+    # static method to run the preprocessing, or to leave every project free when it is turned off
+    # project_values can be passed in when they are already known, in the same order as sorted_projects
+    @staticmethod
+    def _reduce(sorted_projects: List[Project], budget: float, emergency_mode: bool, preprocess: bool = True,
+                project_values: Optional[List[float]] = None) -> PreprocessResult:
+        if preprocess:
+            if project_values is None:
+                project_values = [BranchAndBound._project_value(project, emergency_mode) for project in sorted_projects]
+            return Preprocessor.reduce(sorted_projects, project_values, budget)
+        reduction = PreprocessResult()
+        reduction.free_projects = sorted_projects
+        return reduction
+    
+    # static method that runs the branch and bound search below the given root node
+    # max_profit is the profit a node has to beat, offset is added to the profits reported to on_incumbent
+    # shared_best is an optional multiprocessing value holding the best objective found by any process,
+    # it is read every TIME_CHECK_INTERVAL nodes and updated when this search finds something better
+    # with stats, the bound and heap calls are swapped for timed copies, without stats nothing is added to the loop
+    # bound is one of BOUNDS, the root must already carry a bound of the same kind
+    # top_k > 1 keeps the top_k best selections in a min-heap instead of only the best one, and prunes
+    # against the worst of them once there are top_k. every include node is a different selection (the
+    # one with its project as the last taken), so the heap never holds the same selection twice, and a
+    # selection with the same profit and weight as one in the heap is skipped as a copy of the same plan
+    @staticmethod
+    def _search(root: Node, tables: PrefixTables, budget: float, max_profit: float,
+                strategy: str = "best_first", max_queue_size: Optional[int] = None,
+                time_limit: Optional[float] = None, max_nodes: Optional[int] = None,
+                on_incumbent: Optional[Callable[[float, float, int], None]] = None,
+                offset: float = 0, shared_best=None,
+                on_progress: Optional[Callable[[float, float, int], None]] = None,
+                should_stop: Optional[Callable[[], bool]] = None,
+                stats: Optional[SolveStats] = None, bound: str = "dantzig", top_k: int = 1) -> SearchResult:
+        n = len(tables.costs)
+        costs = tables.costs
+        values = tables.values
+        max_queue_size = max_queue_size or BranchAndBound.HYBRID_QUEUE_LIMIT
+        calculate_bound = BranchAndBound._bound_function(bound)
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+        if stats is not None:
+            calculate_bound = stats.timed("search: bound", "bound_evaluations", calculate_bound)
+            heappush = stats.timed("search: heap", "heap_operations", heappush)
+            heappop = stats.timed("search: heap", "heap_operations", heappop)
+        
+        # the live nodes: a priority queue in best-first mode, a stack in depth-first mode
+        # (if the root already goes over the budget, nothing below it can beat the incumbent)
+        frontier = [root] if root.weight <= budget else []
+        depth_first = strategy == "dfs"
+        
+        # best_node stays empty until the search finds something better than max_profit
+        best_node = None
+        best_nodes = [] if top_k > 1 else None    # (profit, tiebreak, node), the worst of the top_k on top
+        best_keys = set()                         # the rounded (profit, weight) of the nodes in best_nodes
+        nodes_explored = 0
+        nodes_pruned = 0
+        peak_queue_size = 1
+        stop_reason = ""
+        deadline = time_limit is not None and time.perf_counter() + time_limit or None
+        next_progress = 0
         
         # branch and bound process
-        while pq:
-            current = heapq.heappop(pq)
+        while frontier:
+            # stop early if one of the limits was reached
+            if max_nodes is not None and nodes_explored >= max_nodes:
+                stop_reason = "node limit"
+                break
+            if nodes_explored % BranchAndBound.TIME_CHECK_INTERVAL == 0:
+                if should_stop is not None and should_stop():
+                    stop_reason = "cancelled"
+                    break
+                if deadline is not None or on_progress is not None:
+                    now = time.perf_counter()
+                    if deadline is not None and now >= deadline:
+                        stop_reason = "time limit"
+                        break
+                    if on_progress is not None and now >= next_progress:
+                        next_progress = now + BranchAndBound.PROGRESS_INTERVAL
+                        best_profit = max(max_profit, best_node.profit) if best_node is not None else max_profit
+                        upper_bound = max(best_profit, BranchAndBound._frontier_bound(frontier, depth_first))
+                        on_progress(best_profit + offset, upper_bound + offset, nodes_explored)
+                # prune against the best selection found by the other processes
+                if shared_best is not None and shared_best.value - offset > max_profit:
+                    max_profit = shared_best.value - offset
+            
+            current = frontier.pop() if depth_first else heappop(frontier)
+            nodes_explored += 1
             
             if current.bound <= max_profit:
+                nodes_pruned += 1
                 continue  # prune this branch
             
             next_level = current.level + 1 # move to the next project/node
@@ -71,55 +419,133 @@ class BranchAndBound:
                 continue
             
             # includet the next project if it fits in the budget
-            if current.weight + sorted_projects[next_level].cost <= budget:
-                include_selected = current.selected.copy()
-                include_selected[next_level] = True
-                
-                project_benefit = sorted_projects[next_level].benefit
-                
-                # apply emergency and priority calculations
-                if emergency_mode and sorted_projects[next_level].is_emergency_priority:
-                    emergency_bonus = (6 - sorted_projects[next_level].emergency_priority_level) * 0.5
-                    project_benefit += emergency_bonus
-                
+            # (the values already include the emergency bonus)
+            include_node = None
+            if current.weight + costs[next_level] <= budget:
                 # create a new node for including the next project
                 include_node = Node(
                     next_level,
-                    current.profit + project_benefit,
-                    current.weight + sorted_projects[next_level].cost,
-                    include_selected
+                    current.profit + values[next_level],
+                    current.weight + costs[next_level],
+                    current,
+                    True
                 )
                 
                 # check if this node has a better profit
                 if include_node.profit > max_profit:
-                    max_profit = include_node.profit
-                    best_selection = include_node.selected.copy()
+                    if best_nodes is None:
+                        max_profit = include_node.profit
+                        best_node = include_node
+                    else:
+                        # keep the top_k best selections, once there are top_k the worst of them is the one to beat
+                        # a copy of a plan already kept (same profit and weight) is only branched on
+                        key = (round(include_node.profit, 9), round(include_node.weight, 9))
+                        if key not in best_keys:
+                            entry = (include_node.profit, nodes_explored, include_node)
+                            if len(best_nodes) < top_k:
+                                heapq.heappush(best_nodes, entry)
+                            else:
+                                worst = heapq.heapreplace(best_nodes, entry)[2]
+                                best_keys.discard((round(worst.profit, 9), round(worst.weight, 9)))
+                            best_keys.add(key)
+                        if len(best_nodes) == top_k:
+                            max_profit = best_nodes[0][0]
+                        if best_node is None or include_node.profit > best_node.profit:
+                            best_node = include_node
+                    if stats is not None:
+                        stats.counters["incumbent_updates"] += 1
+                    if shared_best is not None:
+                        with shared_best.get_lock():
+                            if max_profit + offset > shared_best.value:
+                                shared_best.value = max_profit + offset
+                    if on_incumbent is not None:
+                        # the best bound left is either the node being expanded or one of the live nodes
+                        upper_bound = max(current.bound, BranchAndBound._frontier_bound(frontier, depth_first))
+                        on_incumbent(best_node.profit + offset, upper_bound + offset, nodes_explored)
                 
-                # calculate the bound for the include node and push it to the priority queue
-                include_node.bound = BranchAndBound._calculate_bound(include_node, sorted_projects, budget, emergency_mode)
-                if include_node.bound > max_profit:
-                    heapq.heappush(pq, include_node)
+                # calculate the bound for the include node
+                include_node.bound = calculate_bound(include_node, tables, budget, max_profit)
             
             # exclude the next project
-            exclude_selected = current.selected.copy()
-            exclude_node = Node(next_level, current.profit, current.weight, exclude_selected)
-            exclude_node.bound = BranchAndBound._calculate_bound(exclude_node, sorted_projects, budget, emergency_mode)
+            exclude_node = Node(next_level, current.profit, current.weight, current, False)
+            exclude_node.bound = calculate_bound(exclude_node, tables, budget, max_profit)
+            
+            # push the children that can still beat the best profit, the others are pruned right away
+            if exclude_node.bound <= max_profit:
+                nodes_pruned += 1
+            if include_node is not None and include_node.bound <= max_profit:
+                nodes_pruned += 1
+            if depth_first:
+                # the include branch goes on top of the stack so it is explored first
+                if exclude_node.bound > max_profit:
+                    frontier.append(exclude_node)
+                if include_node is not None and include_node.bound > max_profit:
+                    frontier.append(include_node)
+            else:
+                if include_node is not None and include_node.bound > max_profit:
+                    heappush(frontier, include_node)
+                if exclude_node.bound > max_profit:
+                    heappush(frontier, exclude_node)
+                
+                # hybrid mode: once the queue reaches the memory cap, carry on depth-first
+                # the queue is sorted so the node with the best bound is on top of the stack
+                if strategy == "hybrid" and len(frontier) >= max_queue_size:
+                    frontier.sort(key=lambda node: node.bound)
+                    depth_first = True
             
-            # check if this node has a better profit and push it to the priority queue
-            if exclude_node.bound > max_profit:
-                heapq.heappush(pq, exclude_node)
+            if len(frontier) > peak_queue_size:
+                peak_queue_size = len(frontier)
         
-        # build the solution
+        result = SearchResult()
+        result.best_node = best_node
+        if best_nodes:
+            result.best_nodes = [node for _, _, node in sorted(best_nodes, key=lambda entry: entry[:2], reverse=True)]
+        result.max_profit = max_profit
+        result.nodes_explored = nodes_explored
+        result.nodes_pruned = nodes_pruned
+        result.peak_queue_size = peak_queue_size
+        if stats is not None:
+            stats.counters["nodes_explored"] += nodes_explored
+            stats.counters["nodes_pruned"] += nodes_pruned
+        result.stop_reason = stop_reason
+        result.remaining_bound = BranchAndBound._frontier_bound(frontier, depth_first)
+        return result
+    
+    # static method to find the best bound among the live nodes
+    # the top of the priority queue holds it, a stack has to be searched
+    @staticmethod
+    def _frontier_bound(frontier: List[Node], depth_first: bool) -> float:
+        if not frontier:
+            return 0
+        if depth_first:
+            return max(node.bound for node in frontier)
+        return frontier[0].bound
+    
+    # static method to build the solution from the ids of the chosen projects
+    # the selected projects are listed in priority order, the same order the gui shows
+    @staticmethod
+    def _build_solution(projects: List[Project], chosen: set, emergency_mode: bool) -> Solution:
         solution = Solution()
-        for i in range(n):
-            if best_selection[i]:
-                solution.selected_projects.append(sorted_projects[i])
-                solution.total_cost += sorted_projects[i].cost
-                solution.total_benefit += sorted_projects[i].benefit
+        for project in BranchAndBound._sort_projects(projects, emergency_mode):
+            if id(project) in chosen:
+                solution.selected_projects.append(project)
+                solution.total_cost += project.cost
+                solution.total_benefit += project.benefit
+                solution.objective += BranchAndBound._project_value(project, emergency_mode)
         
+        # a complete search proves the selection is optimal, the engines lower this when they stop early
+        solution.upper_bound = solution.objective
         solution.efficiency = solution.total_cost > 0 and solution.total_benefit / solution.total_cost or 0
         return solution
     
+    # static method to build the solution from the chosen projects only, the rest of the portfolio is not sorted
+    # positions maps the id of every project to its place in the project list, the chosen projects are put
+    # back in that order first so equal projects are listed the same way as by _build_solution
+    @staticmethod
+    def _build_chosen(chosen_projects: List[Project], positions: dict, emergency_mode: bool) -> Solution:
+        selected = sorted(chosen_projects, key=lambda project: positions[id(project)])
+        return BranchAndBound._build_solution(selected, {id(project) for project in selected}, emergency_mode)
+    
     # static method to sort projects based on benefit-cost ratio and emergency priority
     @staticmethod
     def _sort_projects(projects: List[Project], emergency_mode: bool) -> List[Project]:
@@ -137,9 +563,103 @@ class BranchAndBound:
         
         return sorted(projects, key=compare_projects)
     
-    # static method to calculate the bound for a node/project
+    # static method to order the projects for the search
+    # the fractional bound is only an upper bound when the projects are sorted by benefit-cost ratio,
+    # so in emergency mode the ratio uses the benefit with the emergency bonus added
+    @staticmethod
+    def _search_order(projects: List[Project], emergency_mode: bool) -> List[Project]:
+        if not emergency_mode:
+            return BranchAndBound._sort_projects(projects, emergency_mode)
+        
+        def adjusted_ratio(project):
+            return -(project.cost > 0 and BranchAndBound._project_value(project, True) / project.cost or 0)
+        
+        return sorted(projects, key=adjusted_ratio)
+    
+    # static method to get the benefit of a project, including the emergency bonus if enabled
+    @staticmethod
+    def _project_value(project: Project, emergency_mode: bool) -> float:
+        project_benefit = project.benefit
+        if emergency_mode and project.is_emergency_priority:
+            emergency_bonus = (6 - project.emergency_priority_level) * 0.5
+            project_benefit += emergency_bonus
+        return project_benefit
+    
+    # static method to get the bound function of one of BOUNDS
+    # both are called as bound(node, tables, budget, max_profit)
+    @staticmethod
+    def _bound_function(bound: str) -> Callable[[Node, PrefixTables, float, float], float]:
+        if bound == "martello_toth":
+            return BranchAndBound._calculate_bound_mt
+        return BranchAndBound._calculate_bound
+    
+    # static method to calculate the bound for a node/project (the dantzig bound)
+    # the projects after the node are added greedily until the budget runs out, then a
+    # fraction of the next one; the prefix tables let us find that point with a binary search
+    # max_profit is not needed by this bound, it is accepted so every bound is called the same way
     @staticmethod
-    def _calculate_bound(node: Node, projects: List[Project], budget: float, emergency_mode: bool) -> float:
+    def _calculate_bound(node: Node, tables: PrefixTables, budget: float, max_profit: float = 0) -> float:
+        # if the current node is greater than the budget, ignore it
+        if node.weight >= budget:
+            return 0
+        
+        start = node.level + 1 # the next project to consider
+        remaining_weight = budget - node.weight # remaining budget
+        cum_cost = tables.cum_cost
+        
+        # find the first project that no longer fits, every project from start up to it fits fully
+        stop = bisect_right(cum_cost, cum_cost[start] + remaining_weight, start) - 1
+        bound = node.profit + tables.cum_value[stop] - tables.cum_value[start]
+        
+        # add a fraction of the next project if it fits partially
+        if stop < len(tables.costs):
+            remaining_weight -= cum_cost[stop] - cum_cost[start]
+            bound += (remaining_weight / tables.costs[stop]) * tables.values[stop]
+        
+        return bound
+    
+    # static method to calculate the martello-toth U2 bound for a node
+    # the first project that does not fit (the break project) can not be taken in part, so either:
+    #   it is left out, and the rest of the budget is filled at the ratio of the project after it, or
+    #   it is taken, and the missing budget is freed at the ratio of the project before it
+    # the bound is the better of the two, it is never above the dantzig bound, so the dantzig bound is
+    # worked out first (from the same binary search) and the U2 bound only when it does not prune the node
+    # both use the values of the tables, so the emergency bonus is counted the same way
+    @staticmethod
+    def _calculate_bound_mt(node: Node, tables: PrefixTables, budget: float, max_profit: float = 0) -> float:
+        if node.weight >= budget:
+            return 0
+        
+        start = node.level + 1
+        remaining_weight = budget - node.weight
+        cum_cost = tables.cum_cost
+        costs = tables.costs
+        values = tables.values
+        
+        stop = bisect_right(cum_cost, cum_cost[start] + remaining_weight, start) - 1
+        profit = node.profit + tables.cum_value[stop] - tables.cum_value[start]
+        if stop >= len(costs):
+            return profit # every project left fits, the bound is exact
+        
+        remaining_weight -= cum_cost[stop] - cum_cost[start]
+        dantzig = profit + (remaining_weight / costs[stop]) * values[stop]
+        if dantzig <= max_profit:
+            return dantzig
+        
+        # leave the break project out
+        if stop + 1 < len(costs):
+            bound = profit + remaining_weight * values[stop + 1] / costs[stop + 1]
+        else:
+            bound = profit
+        # take the break project, only possible if a free project before it can make room
+        if stop > start:
+            bound = max(bound, profit + values[stop] - (costs[stop] - remaining_weight) * values[stop - 1] / costs[stop - 1])
+        return bound
+    
+    # the original bound that walks the projects one by one, O(n) per call
+    # kept as a reference for the bound benchmark in benchmark.py
+    @staticmethod
+    def _calculate_bound_linear(node: Node, projects: List[Project], budget: float, emergency_mode: bool) -> float:
         # if the current node is greater than the budget, ignore it
         if node.weight >= budget:
             return 0
@@ -150,25 +670,13 @@ class BranchAndBound:
         
         # add projects to the bound until the budget is exhausted
         while level < len(projects) and projects[level].cost <= remaining_weight:
-            project_benefit = projects[level].benefit
-            
-            # apply emergency bonus for calculation if enabled
-            if emergency_mode and projects[level].is_emergency_priority:
-                emergency_bonus = (6 - projects[level].emergency_priority_level) * 0.5
-                project_benefit += emergency_bonus
-            
-            
-            bound += project_benefit # add the benefit of the project
+            bound += BranchAndBound._project_value(projects[level], emergency_mode) # add the benefit of the project
             remaining_weight -= projects[level].cost # subtract the cost from the remaining budget
             level += 1 # move to the next project
         
         # add a fraction of the next project if it fits partially
         if level < len(projects):
-            project_benefit = projects[level].benefit
-            # if the next project is too expensive, we can't include it fully
-            if emergency_mode and projects[level].is_emergency_priority:
-                emergency_bonus = (6 - projects[level].emergency_priority_level) * 0.5
-                project_benefit += emergency_bonus
+            project_benefit = BranchAndBound._project_value(projects[level], emergency_mode)
             # if the remaining weight is positive, we can include a fraction of the next project
             bound += (remaining_weight / projects[level].cost) * project_benefit
         
@@ -2,17 +2,21 @@
 
 # import the necessary libraries
 import customtkinter as ctk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 import tkinter as tk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.patches as patches
 from collections import defaultdict
-import numpy as np
+import os
+import queue
+import threading
 
+# matplotlib and the chart engine are only imported when the charts tab is first opened, see build_charts
 # import the classes from other files (the files should be in the same directory)
-from project import Project
-from branch_and_bound import BranchAndBound
+from project import Project, apply_emergency_priorities
+from optimizer_session import OptimizerSession
+from virtual_table import VirtualTable
+from portfolio_io import PortfolioIO
+from solve_cache import SolveCache
+from solver_stats import SolveStats, SolverProfiler
 
 # Set the appearance mode and color theme
 ctk.set_appearance_mode("light")
@@ -20,17 +24,51 @@ ctk.set_default_color_theme("blue")
 
 # gui class of the application
 class BudgetAllocationGUI:
+    # stop the search after this many seconds and keep the best allocation found so far
+    SOLVE_TIME_LIMIT = 10
+    # the files the import and export dialogs offer
+    PORTFOLIO_FILE_TYPES = [("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"), ("Parquet files", "*.parquet")]
+    # how many bad rows of an import are listed in the warning
+    IMPORT_ERRORS_SHOWN = 10
+    # how many allocations are found when alternatives are asked for, the best one included
+    ALTERNATIVE_PLANS = 5
+    # the solutions of earlier runs can be kept in this file so they survive a restart, see cache_path
+    CACHE_PATH = os.path.join(os.path.expanduser("~"), ".budget_allocation_cache.sqlite")
 
     # initialize the gui
     def __init__(self, root):
         self.root = root
         self.projects = []
         self.solution = None
+        # keeps the last solve so small edits to the project list are re-optimized quickly
+        self.session = OptimizerSession()
+        # remembers solved problems, pressing optimize again with the same inputs returns right away
+        self.solve_cache = SolveCache(path=self.cache_path())
+        self.solve_key = None
+        # the optimization runs on a worker thread, these pass the progress and the result back
+        self.solve_thread = None
+        self.cancel_event = threading.Event()
+        self.solve_results = queue.Queue()
+        self.solve_progress = None
         self.emergency_mode = tk.BooleanVar(master=self.root)
         self.emergency_type = tk.StringVar(master=self.root, value="Typhoon")
+        # the best allocations of the last solve, the plan box switches between them without solving again
+        self.find_alternatives = tk.BooleanVar(master=self.root)
+        self.plan_choice = tk.StringVar(master=self.root)
+        self.alternatives = []
+        self.plan_budget = None
         
         self.setup_gui()
 
+    # static method to find the file of the disk cache, None keeps the solutions in memory only (the default)
+    # set BUDGET_ALLOCATION_CACHE to a file path to keep them on disk, or to 1 to use CACHE_PATH
+    @staticmethod
+    def cache_path():
+        setting = os.environ.get("BUDGET_ALLOCATION_CACHE", "")
+        if setting in ("", "0"):
+            return None
+        return BudgetAllocationGUI.CACHE_PATH if setting == "1" else setting
+
     # setup the gui 
     def setup_gui(self):
         self.root.title("Group 4 Final Project - Pondong Planado")
@@ -89,35 +127,68 @@ class BudgetAllocationGUI:
         emergency_frame.pack(side="left", padx=20, pady=5)
         
         # check button
-        emergency_check = ctk.CTkCheckBox(emergency_frame, text="Emergency Mode", 
+        self.emergency_check = ctk.CTkCheckBox(emergency_frame, text="Emergency Mode", 
                                        variable=self.emergency_mode,
                                        command=self.toggle_emergency_mode,
                                        font=('Arial', 10, 'bold'),
                                        text_color='black')
-        emergency_check.pack(side="left")
+        self.emergency_check.pack(side="left")
         
         # combo box that contains the emergency types (keeping ttk since CTk combobox is different)
         self.emergency_combo = ttk.Combobox(emergency_frame, textvariable=self.emergency_type,
                                           values=["Typhoon", "Earthquake", "Flood", "Fire", "Health Crisis"],
                                           state="disabled", width=12)
         self.emergency_combo.pack(side="left", padx=5)
+        self.emergency_combo.bind("<<ComboboxSelected>>", self.change_emergency_type)
+        
+        # alternatives frame
+        alternatives_frame = ctk.CTkFrame(top_frame, fg_color="transparent")
+        alternatives_frame.pack(side="left", padx=20, pady=5)
+        
+        self.alternatives_check = ctk.CTkCheckBox(alternatives_frame, text="Find Alternatives",
+                                       variable=self.find_alternatives,
+                                       font=('Arial', 10, 'bold'),
+                                       text_color='black')
+        self.alternatives_check.pack(side="left")
+        
+        # combo box with the plans of the last solve, filled in by show_alternatives
+        self.plan_combo = ttk.Combobox(alternatives_frame, textvariable=self.plan_choice,
+                                       state="disabled", width=16)
+        self.plan_combo.pack(side="left", padx=5)
+        self.plan_combo.bind("<<ComboboxSelected>>", self.change_plan)
         
         # button frame
         button_frame = ctk.CTkFrame(top_frame, fg_color="transparent")
         button_frame.pack(side="right", padx=10, pady=5)
         
-        ctk.CTkButton(button_frame, text="Optimize Allocation", command=self.optimize_budget,
+        self.optimize_button = ctk.CTkButton(button_frame, text="Optimize Allocation", command=self.optimize_budget,
                      fg_color='#2C4E2C', text_color='white', font=('Arial', 10, 'bold'),
-                     hover_color='#3e6b3e', corner_radius=8, width=140).pack(side="left", padx=2)
-        ctk.CTkButton(button_frame, text="Add Project", command=self.show_add_project_dialog,
+                     hover_color='#3e6b3e', corner_radius=8, width=140)
+        self.optimize_button.pack(side="left", padx=2)
+        self.cancel_button = ctk.CTkButton(button_frame, text="Cancel", command=self.cancel_optimization,
+                     fg_color='#696969', text_color='white', hover_color='#808080',
+                     corner_radius=8, width=70, state="disabled")
+        self.cancel_button.pack(side="left", padx=2)
+        self.add_button = ctk.CTkButton(button_frame, text="Add Project", command=self.show_add_project_dialog,
                      fg_color='#4169E1', text_color='white', hover_color='#5a7ce6',
-                     corner_radius=8, width=100).pack(side="left", padx=2)
-        ctk.CTkButton(button_frame, text="Remove Selected", command=self.remove_selected_project,
+                     corner_radius=8, width=100)
+        self.add_button.pack(side="left", padx=2)
+        self.remove_button = ctk.CTkButton(button_frame, text="Remove Selected", command=self.remove_selected_project,
                      fg_color='#DC143C', text_color='white', hover_color='#e6455a',
-                     corner_radius=8, width=120).pack(side="left", padx=2)
-        ctk.CTkButton(button_frame, text="Clear All", command=self.clear_all_projects,
+                     corner_radius=8, width=120)
+        self.remove_button.pack(side="left", padx=2)
+        self.clear_button = ctk.CTkButton(button_frame, text="Clear All", command=self.clear_all_projects,
                      fg_color='#FF6347', text_color='white', hover_color='#ff7a5c',
-                     corner_radius=8, width=80).pack(side="left", padx=2)
+                     corner_radius=8, width=80)
+        self.clear_button.pack(side="left", padx=2)
+        self.import_button = ctk.CTkButton(button_frame, text="Import", command=self.import_projects,
+                     fg_color='#4169E1', text_color='white', hover_color='#5a7ce6',
+                     corner_radius=8, width=70)
+        self.import_button.pack(side="left", padx=2)
+        self.export_button = ctk.CTkButton(button_frame, text="Export", command=self.export_solution,
+                     fg_color='#4169E1', text_color='white', hover_color='#5a7ce6',
+                     corner_radius=8, width=70)
+        self.export_button.pack(side="left", padx=2)
         
         # middle frame
         middle_frame = ctk.CTkFrame(main_tab, fg_color="transparent")
@@ -155,8 +226,9 @@ class BudgetAllocationGUI:
         self.projects_tree.column('Category', width=120, anchor='center')
         self.projects_tree.column('Priority', width=100, anchor='center')
     
-        projects_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical", command=self.projects_tree.yview)
-        self.projects_tree.configure(yscrollcommand=projects_scrollbar.set)
+        # the table keeps the tree in sync with the projects and wires up the scrollbar
+        projects_scrollbar = ttk.Scrollbar(tree_frame, orient="vertical")
+        self.projects_table = VirtualTable(self.projects_tree, projects_scrollbar, self.format_project_row)
         
         self.projects_tree.pack(side="left", fill="both", expand=True)
         projects_scrollbar.pack(side="right", fill="y")
@@ -190,8 +262,8 @@ class BudgetAllocationGUI:
         self.solution_tree.column('Category', width=120, anchor='center')
         self.solution_tree.column('Priority', width=100, anchor='center')
 
-        solution_scrollbar = ttk.Scrollbar(solution_tree_frame, orient="vertical", command=self.solution_tree.yview)
-        self.solution_tree.configure(yscrollcommand=solution_scrollbar.set)
+        solution_scrollbar = ttk.Scrollbar(solution_tree_frame, orient="vertical")
+        self.solution_table = VirtualTable(self.solution_tree, solution_scrollbar, self.format_solution_row)
         
         self.solution_tree.pack(side="left", fill="both", expand=True)
         solution_scrollbar.pack(side="right", fill="y")
@@ -224,23 +296,44 @@ class BudgetAllocationGUI:
                                         anchor="w", text_color='black')
         self.status_label.pack(fill="x", padx=10, pady=5)
         
-    # create the chart tab
+    # create the chart tab, the charts themselves are built the first time the tab is opened
     def create_chart_tab(self):
-        chart_tab = ctk.CTkFrame(self.notebook, fg_color='#E6F3FF', corner_radius=10)
-        self.notebook.add(chart_tab, text="Allocation Charts")
+        self.chart_tab = ctk.CTkFrame(self.notebook, fg_color='#E6F3FF', corner_radius=10)
+        self.notebook.add(self.chart_tab, text="Allocation Charts")
+        self.chart_engine = None
+        
+        # shown until the charts are built
+        self.chart_placeholder = ctk.CTkLabel(self.chart_tab, text="Loading charts...",
+                                              font=('Roboto', 14, 'italic'), text_color='black')
+        self.chart_placeholder.pack(expand=True)
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+        
+    # build the charts when the chart tab is selected
+    def on_tab_changed(self, event=None):
+        if self.chart_engine is None and self.notebook.select() == str(self.chart_tab):
+            self.build_charts()
+        
+    # build the charts, importing matplotlib takes most of the startup time so it is only done here
+    def build_charts(self):
+        import matplotlib.pyplot as plt
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from chart_engine import ChartEngine
+        
+        self.chart_placeholder.destroy()
         
         # create the charts
         self.fig, ((self.ax1, self.ax2), (self.ax3, self.ax4)) = plt.subplots(2, 2, figsize=(12, 8))
         self.fig.suptitle('Budget Allocation Analysis', fontsize=16, fontweight='bold')
         
         # create a canvas that displays the charts
-        canvas_frame = ctk.CTkFrame(chart_tab, fg_color='white', corner_radius=10)
+        canvas_frame = ctk.CTkFrame(self.chart_tab, fg_color='white', corner_radius=10)
         canvas_frame.pack(fill="both", expand=True, padx=10, pady=10)
         
         self.canvas = FigureCanvasTkAgg(self.fig, canvas_frame)
         self.canvas.get_tk_widget().pack(fill="both", expand=True)
+        self.chart_engine = ChartEngine(self.fig, self.canvas, (self.ax1, self.ax2, self.ax3, self.ax4))
         
-        # initialize the empty charts
+        # show the current allocation
         self.update_charts()
         
     # emergency mode toggle function
@@ -251,8 +344,9 @@ class BudgetAllocationGUI:
         current_emergency_type = self.emergency_type.get()
 
         # update all projects once the emergency mode is enabled
-        for project in self.projects:
-            project.set_emergency_priority(is_emergency, current_emergency_type)
+        apply_emergency_priorities(self.projects, current_emergency_type, is_emergency)
+        # the priorities changed, so the last solve can not be reused
+        self.session.reset(self.projects, is_emergency)
         
         self.update_projects_table()
         
@@ -262,6 +356,17 @@ class BudgetAllocationGUI:
         else:
             self.status_label.configure(text="Normal mode - Standard optimization")
     
+    # a new emergency type changes the priorities, so they are applied again right away
+    def change_emergency_type(self, event=None):
+        if not self.emergency_mode.get():
+            return
+        
+        apply_emergency_priorities(self.projects, self.emergency_type.get())
+        # the priorities changed, so the last solve can not be reused
+        self.session.reset(self.projects, True)
+        self.update_projects_table()
+        self.status_label.configure(text=f" Emergency mode enabled - Priorities set for {self.emergency_type.get()}")
+    
     # add projects using dialog
     def show_add_project_dialog(self):
         dialog = ctk.CTkToplevel(self.root)
@@ -359,10 +464,11 @@ class BudgetAllocationGUI:
                 
                 # set the priorities if emergency mode is enabled
                 if self.emergency_mode.get():
-                    project.set_emergency_priority(True)
+                    project.set_emergency_priority(True, self.emergency_type.get())
                 
                 # add the project to the list
                 self.projects.append(project)
+                self.session.add_project(project)
                 self.update_projects_table()
                 dialog.destroy() # close the dialog
                 self.status_label.configure(text=f"Project added successfully. Total projects: {len(self.projects)}")
@@ -396,14 +502,36 @@ class BudgetAllocationGUI:
                 messagebox.showerror("Error", "Please enter a valid positive budget amount.")
                 return
             
+            # the same projects, budget and emergency settings were solved before
+            # the cache only keeps the best allocation, so the alternatives always need a new solve
+            self.solve_key = SolveCache.fingerprint(self.projects, budget, self.emergency_mode.get(),
+                                                    self.emergency_type.get())
+            top_k = self.ALTERNATIVE_PLANS if self.find_alternatives.get() else 1
+            cached = None
+            if top_k == 1:
+                cached = self.solve_cache.get(self.solve_key, self.projects, self.emergency_mode.get())
+            if cached is not None:
+                self.solution = cached
+                self.show_alternatives([], budget)
+                self.display_solution(budget)
+                self.update_charts()
+                self.status_label.configure(text=f"Optimization loaded from cache | {self.solve_cache.summary()}")
+                return
+            
             self.status_label.configure(text="Optimizing budget allocation...")
-            self.root.update()
             
             # optimization with emergency situation consideration
-            self.solution = BranchAndBound.solve_knapsack(self.projects, budget, self.emergency_mode.get())
-            self.display_solution(budget)
-            self.update_charts()
-            self.status_label.configure(text="Optimization completed successfully.")
+            # the session reuses the last solve when only a few projects changed since then
+            if self.session.emergency_mode != self.emergency_mode.get():
+                self.session.reset(self.projects, self.emergency_mode.get())
+            
+            # run the search on a worker thread so the window keeps responding
+            self.set_solving(True)
+            self.cancel_event.clear()
+            self.solve_progress = None
+            self.solve_thread = threading.Thread(target=self.run_optimization, args=(budget, top_k), daemon=True)
+            self.solve_thread.start()
+            self.root.after(100, self.poll_optimization, budget)
 
         # handle the errors  
         except ValueError:
@@ -412,6 +540,103 @@ class BudgetAllocationGUI:
             messagebox.showerror("Error", f"Error during optimization: {str(e)}")
             self.status_label.configure(text="Optimization failed.")
     
+    # runs on the worker thread, the result (or the error) is put in the queue for the main thread
+    # tk widgets and variables must not be touched from here, so top_k is read on the main thread
+    # set BUDGET_ALLOCATION_PROFILE to "cprofile" or "sampling" to write a profile of every solve
+    def run_optimization(self, budget, top_k=1):
+        try:
+            stats = SolveStats()
+            arguments = dict(time_limit=self.SOLVE_TIME_LIMIT, strategy="hybrid", on_progress=self.record_progress,
+                             should_stop=self.cancel_event.is_set, stats=stats, top_k=top_k)
+            profile_mode = os.environ.get("BUDGET_ALLOCATION_PROFILE")
+            if profile_mode:
+                solution = SolverProfiler.run(self.session.optimize, budget, mode=profile_mode, **arguments)
+            else:
+                solution = self.session.optimize(budget, **arguments)
+            self.solve_results.put((solution, None))
+        except Exception as e:
+            self.solve_results.put((None, e))
+    
+    # called by the search on the worker thread, keep only the latest values
+    def record_progress(self, objective, upper_bound, nodes_explored):
+        self.solve_progress = (objective, upper_bound, nodes_explored)
+    
+    # runs on the main thread every 100 ms until the worker thread is done
+    def poll_optimization(self, budget):
+        try:
+            solution, error = self.solve_results.get_nowait()
+        except queue.Empty:
+            # still searching, show the live progress
+            if self.solve_progress is not None:
+                objective, upper_bound, nodes_explored = self.solve_progress
+                self.status_label.configure(text=f"Optimizing... nodes explored: {nodes_explored:,} | "
+                                                 f"best benefit: {objective:.2f} | "
+                                                 f"bound gap: {upper_bound - objective:.2f}")
+            self.root.after(100, self.poll_optimization, budget)
+            return
+        
+        self.solve_thread = None
+        self.set_solving(False)
+        if error is not None:
+            messagebox.showerror("Error", f"Error during optimization: {str(error)}")
+            self.status_label.configure(text="Optimization failed.")
+            return
+        
+        self.solution = solution
+        self.solve_cache.put(self.solve_key, self.projects, solution)
+        self.show_alternatives(solution.alternatives, budget)
+        self.display_solution(budget)
+        self.update_charts()
+        if self.solution.is_optimal:
+            status = "Optimization completed successfully."
+        elif self.solution.stop_reason == "cancelled":
+            status = "Optimization cancelled, showing the best allocation found so far."
+        else:
+            status = (f"Optimization stopped at the {self.solution.stop_reason}, "
+                      f"showing the best allocation found so far.")
+        self.status_label.configure(text=f"{status} | {self.solve_cache.summary()}")
+    
+    # stop the running search, the best allocation found so far is still shown
+    def cancel_optimization(self):
+        if self.solve_thread is not None:
+            self.cancel_event.set()
+            self.status_label.configure(text="Cancelling optimization...")
+    
+    # enable or disable the controls that would change the projects while the search is running
+    def set_solving(self, solving):
+        state = "disabled" if solving else "normal"
+        for widget in (self.optimize_button, self.add_button, self.remove_button, self.clear_button,
+                       self.import_button, self.export_button, self.emergency_check, self.alternatives_check):
+            widget.configure(state=state)
+        # the emergency type changes the priorities the search is reading, so it waits for the search too
+        self.emergency_combo.configure(state="readonly" if self.emergency_mode.get() and not solving else "disabled")
+        self.plan_combo.configure(state="readonly" if self.alternatives and not solving else "disabled")
+        self.cancel_button.configure(state="normal" if solving else "disabled")
+    
+    # fill the plan box with the allocations of the last solve, best first, and show the best one
+    # an empty list clears the box, e.g. when the solution was loaded from the cache or cleared
+    def show_alternatives(self, alternatives, budget=None):
+        self.alternatives = alternatives
+        self.plan_budget = budget
+        plans = []
+        for number, alternative in enumerate(alternatives, start=1):
+            if number == 1:
+                plans.append("Plan 1 (best)")
+            else:
+                plans.append(f"Plan {number} (-{alternatives[0].objective - alternative.objective:.2f})")
+        self.plan_combo.configure(values=plans, state="readonly" if plans else "disabled")
+        self.plan_choice.set(plans[0] if plans else "")
+    
+    # show another allocation of the last solve, the search is not run again
+    def change_plan(self, event=None):
+        index = self.plan_combo.current()
+        if index < 0 or index >= len(self.alternatives):
+            return
+        self.solution = self.alternatives[index]
+        self.display_solution(self.plan_budget)
+        self.update_charts()
+        self.status_label.configure(text=f"Showing plan {index + 1} of {len(self.alternatives)}")
+    
     # display the solutions
     def display_solution(self, budget):
         # if there's no solution
@@ -419,18 +644,7 @@ class BudgetAllocationGUI:
             return
         
         # update the solution table
-        for item in self.solution_tree.get_children():
-            self.solution_tree.delete(item)
-        
-        for project in self.solution.selected_projects:
-            priority_text = f"Emergency P{project.emergency_priority_level}" if project.is_emergency_priority else "Normal"
-            self.solution_tree.insert('', 'end', values=(
-                project.name,
-                f"₱{project.cost:,.2f}",
-                f"{project.benefit:.2f}",
-                project.category,
-                priority_text
-            ))
+        self.solution_table.sync(self.solution.selected_projects)
         
         # update the bottom text area
         result_text = "=== BUDGET ALLOCATION OPTIMIZATION RESULTS ===\n\n"
@@ -443,7 +657,30 @@ class BudgetAllocationGUI:
         result_text += f"Allocated Amount: ₱{self.solution.total_cost:,.2f} ({(self.solution.total_cost / budget) * 100:.1f}%)\n"
         result_text += f"Remaining Budget: ₱{budget - self.solution.total_cost:,.2f}\n"
         result_text += f"Total Benefit Score: {self.solution.total_benefit:.2f}\n"
-        result_text += f"Efficiency Ratio: {self.solution.efficiency:.3f}\n\n"
+        result_text += f"Efficiency Ratio: {self.solution.efficiency:.3f}\n"
+        
+        # an alternative plan shows how much benefit it gives up against the best plan
+        if self.alternatives and self.solution is not self.alternatives[0]:
+            plan = next(number for number, alternative in enumerate(self.alternatives, start=1)
+                        if alternative is self.solution)
+            result_text += f"Alternative Plan {plan} of {len(self.alternatives)}: "
+            result_text += f"{self.alternatives[0].objective - self.solution.objective:.2f} below the best plan\n"
+        
+        # if the search was stopped early, show how far the allocation can be from the optimum
+        # (an alternative plan is never optimal, but it only has a stop reason if the search was stopped)
+        if not self.solution.is_optimal and self.solution.stop_reason:
+            result_text += f"Search stopped ({self.solution.stop_reason}): best possible score is at most "
+            result_text += f"{self.solution.upper_bound:.2f}, gap {self.solution.upper_bound - self.solution.objective:.2f}\n"
+        
+        # show how much the preprocessing shrank the search
+        if self.solution.preprocessing:
+            removed = ", ".join(f"{step}: {count}" for step, count in self.solution.preprocessing.items())
+            result_text += f"Projects decided before the search ({removed})\n"
+        result_text += "\n"
+        
+        # show where the solver spent its time
+        if self.solution.stats is not None:
+            result_text += self.solution.stats.report() + "\n\n"
         
         result_text += "Selected Projects (Priority Order):\n"
         result_text += "─" * 60 + "\n"
@@ -466,173 +703,67 @@ class BudgetAllocationGUI:
         self.result_text.delete(1.0, "end")
         self.result_text.insert(1.0, result_text)
     
-    # update the charts
+    # update the charts, only the charts whose data changed are drawn again
+    # nothing to do until the chart tab was opened, build_charts shows the allocation of that moment
     def update_charts(self):
-        # clear all the axes
-        for ax in [self.ax1, self.ax2, self.ax3, self.ax4]:
-            ax.clear()
-        
-        if not self.solution or not self.solution.selected_projects:
-            # show empty state if there's no solution
-            self.ax1.text(0.5, 0.5, 'No data available\nRun optimization first', 
-                         ha='center', va='center', transform=self.ax1.transAxes, fontsize=12)
-            self.ax2.text(0.5, 0.5, 'No data available\nRun optimization first', 
-                         ha='center', va='center', transform=self.ax2.transAxes, fontsize=12)
-            self.ax3.text(0.5, 0.5, 'No data available\nRun optimization first', 
-                         ha='center', va='center', transform=self.ax3.transAxes, fontsize=12)
-            self.ax4.text(0.5, 0.5, 'No data available\nRun optimization first', 
-                         ha='center', va='center', transform=self.ax4.transAxes, fontsize=12)
-        else:
-            self._create_budget_utilization_chart()
-            self._create_category_breakdown_chart()
-            self._create_project_comparison_chart()
-            self._create_priority_distribution_chart()
-        
-        self.fig.tight_layout()
-        self.canvas.draw()
-    
-    # create the budget utilization pie chart
-    def _create_budget_utilization_chart(self):
-        budget = float(self.budget_entry.get()) if self.budget_entry.get() else 0
-        if budget <= 0:
+        if self.chart_engine is None:
             return
-        
-        # calculate the allocated and remaining budget
-        allocated = self.solution.total_cost
-        remaining = budget - allocated
-        
-        # define the sizes, labels, and colors for the pie chart
-        sizes = [allocated, remaining]
-        labels = ['Allocated', 'Remaining']
-        colors = ['#32CD32', '#FF6347']
-        
-        # plot the pie chart
-        wedges, texts, autotexts = self.ax1.pie(sizes, labels=None, colors=colors, autopct='%1.1f%%', startangle=90, pctdistance=0.85)
-        self.ax1.set_title('Budget Utilization')
-        self.ax1.legend(wedges, labels, title="Status", loc="center left", bbox_to_anchor=(1,0,0.5,1))
-        self.ax1.axis('equal')
+        budget = float(self.budget_entry.get()) if self.budget_entry.get() else 0
+        self.chart_engine.update(self.solution, budget, self.emergency_mode.get())
     
-    # create the category breakdown pie chart
-    def _create_category_breakdown_chart(self):
-        # calculate the total cost per category
-        category_totals = defaultdict(float)
-        for project in self.solution.selected_projects:
-            category_totals[project.category] += project.cost
-        
-        if category_totals:
-            categories = list(category_totals.keys())
-            costs = list(category_totals.values())
-            colors = plt.cm.Set3(np.linspace(0, 1, len(categories)))
-            # plot the pie chart
-            wedges, texts, autotexts = self.ax2.pie(costs, labels=None, colors=colors, autopct='%1.1f%%', startangle=90, pctdistance=0.85)
-            self.ax2.set_title('Allocation by Category')
-            self.ax2.legend(wedges, categories, title="Categories", loc="center left", bbox_to_anchor=(1,0,0.5,1))
-            self.ax2.axis('equal')   
-
-    # create the project comparison bar chart
-    def _create_project_comparison_chart(self):
-        # show top 10 projects by cost if there are more than 10 projects
-        if len(self.solution.selected_projects) > 10:
-            projects = sorted(self.solution.selected_projects, key=lambda x: x.cost, reverse=True)[:10]
-        else:
-            projects = self.solution.selected_projects
-        
-        # define the names, cost, and benefits for the bar chart
-        names = [p.name[:15] + '...' if len(p.name) > 15 else p.name for p in projects]
-        costs = [p.cost for p in projects]
-        benefits = [p.benefit for p in projects]
-        
-        # define the bar chart
-        x = np.arange(len(names))
-        width = 0.15
-        
-        # create the bar chart for costs and benefits
-        bars1 = self.ax3.bar(x - width/2, costs, width, label='Cost (₱)', color='#4169E1', alpha=0.7)
-        bars2 = self.ax3.bar(x + width/2, [b * 1000 for b in benefits], width, label='Benefit (×1000)', color='#32CD32', alpha=0.7)
-        
-        # add labels and title
-        self.ax3.set_xlabel('Projects')
-        self.ax3.set_ylabel('Amount')
-        self.ax3.set_title('Selected Projects - Cost vs Benefit')
-        self.ax3.set_xticks(x)
-        self.ax3.set_xticklabels(names, rotation=90, ha='right')
-        self.ax3.legend()
+    # update projects table, only the rows that changed are touched
+    def update_projects_table(self):
+        self.projects_table.sync(self.projects)
     
-    # create the emergency priority distribution chart
-    def _create_priority_distribution_chart(self):
-        # check if emergency mode is enabled and if there are projects selected
-        if self.emergency_mode.get():
-            priority_counts = defaultdict(int)
-            for project in self.solution.selected_projects:
-                if project.is_emergency_priority:
-                    priority_counts[f"Priority {project.emergency_priority_level}"] += 1
-                else:
-                    priority_counts["Normal"] += 1 # normal priority projects
-            
-            # if there are emergency priority projects
-            if priority_counts:
-                priorities = list(priority_counts.keys())
-                counts = list(priority_counts.values())
-                colors = ['#FF4500', '#FF6347', '#FFA500', '#FFD700', '#90EE90', '#87CEEB']
-                
-                # plot the bar chart
-                bars = self.ax4.bar(priorities, counts, color=colors[:len(priorities)])
-                self.ax4.set_title('Emergency Priority Distribution')
-                self.ax4.set_ylabel('Number of Projects')
-                
-                # edit the bars of the bar chart
-                for bar in bars:
-                    height = bar.get_height()
-                    self.ax4.text(bar.get_x() + bar.get_width()/2., height,
-                                f'{int(height)}', ha='center', va='bottom')
-        else: # if emergency mode is not enabled
-            self.ax4.text(0.5, 0.5, 'Emergency mode not enabled',
-                         ha='center', va='center', transform=self.ax4.transAxes, fontsize=12)
-            self.ax4.set_title('Emergency Priority Distribution')
+    # the values of a row in the projects table
+    @staticmethod
+    def format_project_row(project):
+        priority_text = f"Emergency P{project.emergency_priority_level}" if project.is_emergency_priority else "Normal"
+        return (
+            project.name,
+            f"₱{project.cost:,.2f}",
+            f"{project.benefit:.2f}",
+            f"{project.benefit_cost_ratio:.3f}",
+            project.category,
+            priority_text
+        )
+    
+    # the values of a row in the solution table
+    @staticmethod
+    def format_solution_row(project):
+        priority_text = f"Emergency P{project.emergency_priority_level}" if project.is_emergency_priority else "Normal"
+        return (
+            project.name,
+            f"₱{project.cost:,.2f}",
+            f"{project.benefit:.2f}",
+            project.category,
+            priority_text
+        )
     
-    # update projects table
-    def update_projects_table(self):
-
-        # clear the existing projects in the table
-        for item in self.projects_tree.get_children():
-            self.projects_tree.delete(item)
-        
-        #  return project values to the table
-        for project in self.projects:
-            priority_text = f"Emergency P{project.emergency_priority_level}" if project.is_emergency_priority else "Normal"
-            self.projects_tree.insert('', 'end', values=(
-                project.name,
-                f"₱{project.cost:,.2f}",
-                f"{project.benefit:.2f}",
-                f"{project.benefit_cost_ratio:.3f}",
-                project.category,
-                priority_text
-            ))
     # remove selected project from the projects table
     def remove_selected_project(self):
-        selection = self.projects_tree.selection()
-        if not selection: # if there's no selected projects
+        # the row is keyed by the project id, so this finds the project even when only part of the list is shown
+        project = self.projects_table.selected_item()
+        if project is None: # if there's no selected projects
             messagebox.showwarning("Warning", "Please select a project to remove.")
             return
         
-        # store the project in a list and get the index of the selected project
-        item = selection[0]
-        index = self.projects_tree.index(item)
-        project_name = self.projects[index].name
+        project_name = project.name
         
         # confirm the removal
         result = messagebox.askyesno("Confirm Removal", 
                                    f"Are you sure you want to remove project: {project_name}?")
         # if the user picked yes
         if result:
-            del self.projects[index]
+            self.session.remove_project(project)
+            self.projects.remove(project)
             self.update_projects_table()
             
             # clear the solution if the removed project was part of it
-            for item in self.solution_tree.get_children():
-                self.solution_tree.delete(item)
+            self.solution_table.sync([])
             self.result_text.delete(1.0, "end")
             self.solution = None
+            self.show_alternatives([])
             self.update_charts()
             
             self.status_label.configure(text=f"Project removed. Total projects: {len(self.projects)}")
@@ -650,16 +781,72 @@ class BudgetAllocationGUI:
         # if the user picked yes
         if result:
             self.projects.clear()
+            self.session.reset(self.projects, self.emergency_mode.get())
             self.update_projects_table()
             
             # clear the solution and result text
-            for item in self.solution_tree.get_children():
-                self.solution_tree.delete(item)
+            self.solution_table.sync([])
             self.result_text.delete(1.0, "end")
             self.solution = None
+            self.show_alternatives([])
             self.update_charts()
             
             self.status_label.configure(text="All projects cleared.")
+    
+    # import projects from a csv, json lines or parquet file
+    def import_projects(self):
+        path = filedialog.askopenfilename(title="Import Projects", filetypes=self.PORTFOLIO_FILE_TYPES)
+        if not path:
+            return
+        
+        # show how far the import got after every chunk
+        def show_progress(rows_read):
+            self.status_label.configure(text=f"Importing projects... {rows_read:,} rows read")
+            self.root.update_idletasks()
+        
+        try:
+            result = PortfolioIO.import_projects(path, on_chunk=show_progress)
+        except (OSError, ValueError, ImportError) as e:
+            messagebox.showerror("Error", f"Could not import the file.\n{str(e)}")
+            self.status_label.configure(text="Import failed.")
+            return
+        
+        # set the priorities if emergency mode is enabled
+        if self.emergency_mode.get():
+            apply_emergency_priorities(result.projects, self.emergency_type.get())
+        
+        # add the projects to the list, the session is rebuilt once instead of once per project
+        self.projects.extend(result.projects)
+        self.session.reset(self.projects, self.emergency_mode.get())
+        self.update_projects_table()
+        self.status_label.configure(text=f"Imported {len(result.projects):,} projects, skipped {result.error_count:,} bad rows. "
+                                         f"Total projects: {len(self.projects):,}")
+        
+        # show the bad rows, but only the first few
+        if result.error_count:
+            shown = result.errors[:self.IMPORT_ERRORS_SHOWN]
+            details = "\n".join(f"Row {row}: {message}" for row, message in shown)
+            if result.error_count > len(shown):
+                details += f"\n... and {result.error_count - len(shown):,} more"
+            messagebox.showwarning("Import Warnings", f"{result.error_count:,} rows were skipped:\n{details}")
+    
+    # export the selected projects of the current solution
+    def export_solution(self):
+        if not self.solution or not self.solution.selected_projects:
+            messagebox.showwarning("Warning", "Please run the optimization first.")
+            return
+        
+        path = filedialog.asksaveasfilename(title="Export Solution", defaultextension=".csv",
+                                            filetypes=self.PORTFOLIO_FILE_TYPES)
+        if not path:
+            return
+        
+        try:
+            PortfolioIO.export_solution(self.solution, path)
+        except (OSError, ValueError, ImportError) as e:
+            messagebox.showerror("Error", f"Could not export the solution.\n{str(e)}")
+            return
+        self.status_label.configure(text=f"Exported {len(self.solution.selected_projects):,} projects to {path}")
 
 # main function
 def main():
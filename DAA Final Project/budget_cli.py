@@ -0,0 +1,198 @@
+# this file runs the budget allocation from the command line, without the gui
+# it only imports the solver modules, so it starts fast and runs on servers without a display
+#
+# examples:
+#   python budget_cli.py portfolio.csv --budget 5000000
+#   python budget_cli.py barangays/*.csv --budgets budgets.csv --workers 4 --format csv --output-dir results
+#   python budget_cli.py portfolio.jsonl --budget 2e6 --emergency "Typhoon"
+
+# import the necessary libraries
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# import the classes from other files (the files should be in the same directory)
+from project import apply_emergency_priorities
+from portfolio_io import PortfolioIO
+from solver import Solver
+from branch_and_bound import BranchAndBound
+
+# the output formats, json writes the whole solution, csv writes the selected projects in the import format
+OUTPUT_FORMATS = ("json", "csv")
+
+# static helpers for the command line
+class BudgetCLI:
+    # static method to read the budget of every portfolio from a csv file with the columns file and budget
+    # the file column can be the file name or its name without the extension
+    @staticmethod
+    def read_budgets(path):
+        budgets = {}
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            for row in csv.DictReader(file):
+                budgets[row["file"].strip()] = float(row["budget"])
+        return budgets
+
+    # static method to find the budget of a portfolio file
+    @staticmethod
+    def budget_for(path, budget, budgets):
+        name = os.path.basename(path)
+        for key in (name, os.path.splitext(name)[0], path):
+            if key in budgets:
+                return budgets[key]
+        if budget is None:
+            raise ValueError(f"No budget given for {name}, use --budget or add it to the --budgets file.")
+        return budget
+
+    # static method to turn a solution into plain data for the json output
+    @staticmethod
+    def solution_data(path, budget, emergency_type, solution, elapsed, rows_read, error_count):
+        return {
+            "file": path,
+            "budget": budget,
+            "emergency_type": emergency_type,
+            "projects_read": rows_read,
+            "rows_skipped": error_count,
+            "total_cost": solution.total_cost,
+            "remaining_budget": budget - solution.total_cost,
+            "total_benefit": solution.total_benefit,
+            "objective": solution.objective,
+            "efficiency": solution.efficiency,
+            "is_optimal": solution.is_optimal,
+            "upper_bound": solution.upper_bound,
+            "gap": solution.gap,
+            "epsilon": solution.epsilon,
+            "stop_reason": solution.stop_reason,
+            "engine": solution.engine,
+            "nodes_explored": solution.nodes_explored,
+            "solve_time_s": elapsed,
+            "selected_projects": [
+                {
+                    "name": project.name,
+                    "cost": project.cost,
+                    "benefit": project.benefit,
+                    "category": project.category,
+                    "description": project.description,
+                    "emergency_priority_level": project.emergency_priority_level if project.is_emergency_priority else None,
+                }
+                for project in solution.selected_projects
+            ],
+        }
+
+    # static method to load, solve and write one portfolio, runs in a worker process when --workers > 1
+    # returns a short summary, or the error message if the file could not be allocated
+    @staticmethod
+    def allocate_file(path, budget, emergency_type, output_dir, output_format, time_limit, strategy,
+                      bound="dantzig", epsilon=None):
+        try:
+            imported = PortfolioIO.import_projects(path)
+            emergency_mode = emergency_type is not None
+            if emergency_mode:
+                apply_emergency_priorities(imported.projects, emergency_type)
+
+            start = time.perf_counter()
+            solution = Solver.solve_knapsack(imported.projects, budget, emergency_mode,
+                                             time_limit=time_limit, strategy=strategy, bound=bound,
+                                             approximate=epsilon is not None, epsilon=epsilon or 0.01)
+            elapsed = time.perf_counter() - start
+
+            # results/portfolio.csv -> results/portfolio.allocation.json
+            stem = os.path.splitext(os.path.basename(path))[0]
+            output = os.path.join(output_dir or os.path.dirname(path) or ".", f"{stem}.allocation.{output_format}")
+            if output_format == "json":
+                data = BudgetCLI.solution_data(path, budget, emergency_type, solution, elapsed,
+                                               imported.rows_read, imported.error_count)
+                with open(output, "w", encoding="utf-8") as file:
+                    json.dump(data, file, indent=2, ensure_ascii=False)
+            else:
+                PortfolioIO.export_solution(solution, output)
+
+            return {
+                "file": path,
+                "output": output,
+                "projects": len(imported.projects),
+                "skipped": imported.error_count,
+                "selected": len(solution.selected_projects),
+                "total_cost": solution.total_cost,
+                "total_benefit": solution.total_benefit,
+                "is_optimal": solution.is_optimal,
+                "gap": solution.gap,
+                "epsilon": solution.epsilon,
+                "time": elapsed,
+                "error": None,
+            }
+        except (OSError, ValueError, ImportError) as e:
+            return {"file": path, "error": str(e)}
+        # any other error is recorded as the failure of this file only, so the other files of the batch still finish
+        except Exception as e:
+            return {"file": path, "error": f"unexpected {type(e).__name__}: {e}"}
+
+    # static method to parse the command line
+    @staticmethod
+    def parse_arguments(argv=None):
+        parser = argparse.ArgumentParser(description="Allocate a budget over project portfolios without the gui.")
+        parser.add_argument("portfolios", nargs="+", help="portfolio files (.csv, .jsonl or .parquet)")
+        parser.add_argument("--budget", type=float, help="budget for every portfolio, in pesos")
+        parser.add_argument("--budgets", help="csv file with the columns file and budget, one budget per portfolio")
+        parser.add_argument("--emergency", metavar="TYPE",
+                            help="run in emergency mode for this emergency type, e.g. Typhoon or \"Health Crisis\"")
+        parser.add_argument("--format", choices=OUTPUT_FORMATS, default="json", help="output format (default json)")
+        parser.add_argument("--output-dir", help="folder for the results (default: next to every portfolio)")
+        parser.add_argument("--workers", type=int, default=1, help="portfolios solved at the same time")
+        parser.add_argument("--time-limit", type=float, help="stop every search after this many seconds")
+        parser.add_argument("--strategy", choices=BranchAndBound.STRATEGIES, default="hybrid",
+                            help="branch and bound search strategy (default hybrid)")
+        parser.add_argument("--bound", choices=BranchAndBound.BOUNDS, default="dantzig",
+                            help="branch and bound upper bound, martello_toth prunes more on correlated portfolios "
+                                 "(default dantzig)")
+        parser.add_argument("--approximate", type=float, metavar="EPSILON",
+                            help="skip the exact search and return an allocation worth at least (1 - EPSILON) "
+                                 "of the best one, e.g. 0.01, fast on very large portfolios")
+        args = parser.parse_args(argv)
+        if args.budget is None and args.budgets is None:
+            parser.error("either --budget or --budgets is required")
+        return args
+
+# main function, returns the exit code: 0 if every portfolio was allocated, 1 otherwise
+def main(argv=None):
+    args = BudgetCLI.parse_arguments(argv)
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    try:
+        budgets = BudgetCLI.read_budgets(args.budgets) if args.budgets else {}
+        jobs = [(path, BudgetCLI.budget_for(path, args.budget, budgets), args.emergency, args.output_dir,
+                 args.format, args.time_limit, args.strategy, args.bound, args.approximate) for path in args.portfolios]
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    # every portfolio is independent, so several of them can be solved at the same time
+    if args.workers > 1 and len(jobs) > 1:
+        with ProcessPoolExecutor(max_workers=args.workers) as executor:
+            results = list(executor.map(BudgetCLI.allocate_file, *zip(*jobs)))
+    else:
+        results = [BudgetCLI.allocate_file(*job) for job in jobs]
+
+    failed = 0
+    for result in results:
+        if result["error"] is not None:
+            failed += 1
+            print(f"{result['file']}: failed, {result['error']}", file=sys.stderr)
+            continue
+        if result["is_optimal"]:
+            optimal = "optimal"
+        elif result["epsilon"] is not None:
+            optimal = f"within {result['gap']:.4%} of the bound, guaranteed {1 - result['epsilon']:.1%} of the best"
+        else:
+            optimal = "not proven optimal"
+        print(f"{result['file']}: {result['selected']}/{result['projects']} projects, "
+              f"cost ₱{result['total_cost']:,.2f}, benefit {result['total_benefit']:.2f} ({optimal}), "
+              f"{result['time']:.2f} s, {result['skipped']} rows skipped -> {result['output']}")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+# this file draws the allocation charts without rebuilding them on every optimization
+# the bars, wedges and labels of every chart are created once and then updated in place, only the charts
+# whose data changed are drawn again, and when the axes themselves did not change the new artists are
+# blitted on top of a saved background instead of redrawing the whole figure
+
+# import the necessary libraries
+import math
+from collections import defaultdict
+import matplotlib.pyplot as plt
+import numpy as np
+
+# one chart on one axes, it keeps its artists between updates
+class Chart:
+    # initialize the chart
+    def __init__(self, ax, title):
+        self.ax = ax
+        self.title = title
+        self.data = None        # the data the chart shows right now, used to skip updates that change nothing
+        self.layout = None      # what the static part of the axes (ticks, limits, legend) was drawn for
+        self.artists = []       # the animated artists, they are drawn on top of the saved background
+        self.background = None  # the axes without the animated artists, saved after every full draw
+
+    # show a centered message instead of the chart
+    # returns "same" if nothing changed, "blit" if only the animated artists changed, "full" if the axes changed
+    def show_message(self, message, title=None):
+        data = ("message", message, title)
+        if data == self.data:
+            return "same"
+        self.ax.clear()
+        self.artists = []
+        self.layout = None
+        self.ax.text(0.5, 0.5, message, ha='center', va='center', transform=self.ax.transAxes, fontsize=12)
+        if title:
+            self.ax.set_title(title)
+        self.data = data
+        return "full"
+
+    # mark artists as animated, a full draw leaves them out and they are drawn by draw_artists
+    def animate(self, artists):
+        for artist in artists:
+            artist.set_animated(True)
+        self.artists.extend(artists)
+
+    # draw the animated artists on the canvas
+    def draw_artists(self):
+        for artist in self.artists:
+            self.ax.draw_artist(artist)
+
+# pie chart, the wedges and the percentages move when the sizes change
+class PieChart(Chart):
+    START_ANGLE = 90
+    PCT_DISTANCE = 0.85
+
+    # initialize the pie chart
+    def __init__(self, ax, title, legend_title):
+        super().__init__(ax, title)
+        self.legend_title = legend_title
+        self.wedges = []
+        self.autotexts = []
+
+    # show the sizes of the slices, the colors are only used when the slices change
+    def update(self, labels, sizes, colors):
+        data = (tuple(labels), tuple(sizes))
+        if data == self.data:
+            return "same"
+        total = sum(sizes)
+
+        if self.layout == tuple(labels):
+            # same slices, only the edges of the wedges and the percentages move
+            angle = self.START_ANGLE
+            for wedge, autotext, size in zip(self.wedges, self.autotexts, sizes):
+                sweep = 360 * size / total
+                wedge.set_theta1(angle)
+                wedge.set_theta2(angle + sweep)
+                middle = math.radians(angle + sweep / 2)
+                autotext.set_position((self.PCT_DISTANCE * math.cos(middle), self.PCT_DISTANCE * math.sin(middle)))
+                autotext.set_text('%1.1f%%' % (100 * size / total))
+                angle += sweep
+            change = "blit"
+        else:
+            # different slices, the legend changes too, so the pie is built again
+            self.ax.clear()
+            self.artists = []
+            self.wedges, texts, self.autotexts = self.ax.pie(sizes, labels=None, colors=colors, autopct='%1.1f%%',
+                                                             startangle=self.START_ANGLE, pctdistance=self.PCT_DISTANCE)
+            self.ax.set_title(self.title)
+            self.ax.legend(self.wedges, labels, title=self.legend_title, loc="center left", bbox_to_anchor=(1,0,0.5,1))
+            self.ax.axis('equal')
+            self.animate(self.wedges + self.autotexts)
+            self.layout = tuple(labels)
+            change = "full"
+
+        self.data = data
+        return change
+
+# bar chart with one or more series side by side, the bars are resized when the values change
+class BarChart(Chart):
+    # the y axis limit is rounded up to one of these steps (times a power of ten), so small changes
+    # in the values keep the same limit and can be blitted
+    LIMIT_STEPS = (1, 1.2, 1.5, 2, 2.5, 3, 4, 5, 6, 8, 10)
+
+    # initialize the bar chart
+    def __init__(self, ax, title, xlabel=None, ylabel=None, width=0.8, rotation=0, legend=False, value_labels=False):
+        super().__init__(ax, title)
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.width = width
+        self.rotation = rotation
+        self.legend = legend
+        self.value_labels = value_labels
+        self.bars = []          # one list of bars per series
+        self.texts = []         # the value above every bar of the first series
+
+    # round the largest value up to a nice axis limit
+    @staticmethod
+    def nice_limit(value):
+        if value <= 0:
+            return 1
+        scale = 10 ** math.floor(math.log10(value))
+        for step in BarChart.LIMIT_STEPS:
+            if value <= step * scale:
+                return step * scale
+        return 10 * scale
+
+    # show the bars, series is a list of (label, values, color, alpha)
+    def update(self, names, series):
+        data = (tuple(names), tuple(tuple(values) for label, values, color, alpha in series))
+        if data == self.data:
+            return "same"
+
+        margin = 1.15 if self.value_labels else 1.05
+        top = self.nice_limit(max((max(values, default=0) for label, values, color, alpha in series), default=0) * margin)
+        layout = (tuple(names), top)
+
+        if self.layout is not None and len(self.bars) == len(series) and len(self.bars[0]) == len(names):
+            # same number of bars, resize them and move the value labels
+            for bars, (label, values, color, alpha) in zip(self.bars, series):
+                for bar, value in zip(bars, values):
+                    bar.set_height(value)
+            for text, bar in zip(self.texts, self.bars[0]):
+                text.set_position((bar.get_x() + bar.get_width() / 2., bar.get_height()))
+                text.set_text(f'{int(bar.get_height())}')
+            if layout == self.layout:
+                change = "blit"
+            else:
+                # the names or the limit changed, the bars are kept but the axes is drawn again
+                self.ax.set_xticklabels(names, rotation=self.rotation, ha='right' if self.rotation else 'center')
+                self.ax.set_ylim(0, top)
+                change = "full"
+        else:
+            self.build(names, series, top)
+            change = "full"
+
+        self.layout = layout
+        self.data = data
+        return change
+
+    # build the bars from scratch, only needed when the number of bars changes
+    def build(self, names, series, top):
+        self.ax.clear()
+        self.artists = []
+        self.bars = []
+        self.texts = []
+        x = np.arange(len(names))
+        for index, (label, values, color, alpha) in enumerate(series):
+            offset = (index - (len(series) - 1) / 2) * self.width
+            bars = self.ax.bar(x + offset, values, self.width, label=label, color=color, alpha=alpha)
+            self.bars.append(list(bars))
+            self.animate(list(bars))
+
+        if self.value_labels:
+            for bar in self.bars[0]:
+                height = bar.get_height()
+                self.texts.append(self.ax.text(bar.get_x() + bar.get_width()/2., height,
+                                               f'{int(height)}', ha='center', va='bottom'))
+            self.animate(self.texts)
+
+        # add labels and title
+        if self.xlabel:
+            self.ax.set_xlabel(self.xlabel)
+        if self.ylabel:
+            self.ax.set_ylabel(self.ylabel)
+        self.ax.set_title(self.title)
+        self.ax.set_xticks(x)
+        self.ax.set_xticklabels(names, rotation=self.rotation, ha='right' if self.rotation else 'center')
+        self.ax.set_ylim(0, top)
+        if self.legend:
+            self.ax.legend()
+
+# chart engine class, it owns the four charts of the chart tab
+class ChartEngine:
+    # the project comparison chart shows this many projects, the rest are added up in one "others" bar
+    TOP_PROJECTS = 10
+    EMPTY_MESSAGE = 'No data available\nRun optimization first'
+    PRIORITY_COLORS = ['#FF4500', '#FF6347', '#FFA500', '#FFD700', '#90EE90', '#87CEEB']
+
+    # initialize the charts on the given axes of the figure
+    def __init__(self, figure, canvas, axes):
+        self.figure = figure
+        self.canvas = canvas
+        ax1, ax2, ax3, ax4 = axes
+        self.budget_chart = PieChart(ax1, 'Budget Utilization', "Status")
+        self.category_chart = PieChart(ax2, 'Allocation by Category', "Categories")
+        self.comparison_chart = BarChart(ax3, 'Selected Projects - Cost vs Benefit', xlabel='Projects',
+                                         ylabel='Amount', width=0.15, rotation=90, legend=True)
+        self.priority_chart = BarChart(ax4, 'Emergency Priority Distribution', ylabel='Number of Projects',
+                                       value_labels=True)
+        self.charts = [self.budget_chart, self.category_chart, self.comparison_chart, self.priority_chart]
+
+        # every full draw (also the ones tk does when the window is resized) saves the backgrounds
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+    # a full draw leaves out the animated artists, save the backgrounds and draw them on top
+    def on_draw(self, event):
+        for chart in self.charts:
+            chart.background = self.canvas.copy_from_bbox(chart.ax.bbox)
+            chart.draw_artists()
+
+    # show a solution, or the empty state if there is none
+    def update(self, solution, budget, emergency_mode):
+        if not solution or not solution.selected_projects:
+            changes = [chart.show_message(self.EMPTY_MESSAGE) for chart in self.charts]
+        else:
+            changes = [self._update_budget_utilization(solution, budget),
+                       self._update_category_breakdown(solution),
+                       self._update_project_comparison(solution),
+                       self._update_priority_distribution(solution, emergency_mode)]
+        self.redraw(changes)
+
+    # draw the charts that changed
+    def redraw(self, changes):
+        if "full" in changes or any(chart.background is None for chart in self.charts):
+            # an axes changed, draw the whole figure, on_draw saves the new backgrounds
+            self.figure.tight_layout()
+            self.canvas.draw()
+            return
+
+        # only the animated artists changed, put them on top of the saved backgrounds
+        for chart, change in zip(self.charts, changes):
+            if change == "blit":
+                self.canvas.restore_region(chart.background)
+                chart.draw_artists()
+                self.canvas.blit(chart.ax.bbox)
+
+    # the budget utilization pie chart
+    def _update_budget_utilization(self, solution, budget):
+        if budget <= 0:
+            return self.budget_chart.show_message("")
+
+        # calculate the allocated and remaining budget
+        allocated = solution.total_cost
+        remaining = budget - allocated
+        return self.budget_chart.update(['Allocated', 'Remaining'], [allocated, remaining], ['#32CD32', '#FF6347'])
+
+    # the category breakdown pie chart
+    def _update_category_breakdown(self, solution):
+        # calculate the total cost per category
+        category_totals = defaultdict(float)
+        for project in solution.selected_projects:
+            category_totals[project.category] += project.cost
+
+        categories = list(category_totals.keys())
+        costs = list(category_totals.values())
+        if sum(costs) <= 0:
+            return self.category_chart.show_message("")
+        colors = plt.cm.Set3(np.linspace(0, 1, len(categories)))
+        return self.category_chart.update(categories, costs, colors)
+
+    # the project comparison bar chart, the most expensive projects and one bar for the rest
+    def _update_project_comparison(self, solution):
+        projects = solution.selected_projects
+        others = []
+        if len(projects) > self.TOP_PROJECTS:
+            projects = sorted(projects, key=lambda x: x.cost, reverse=True)
+            projects, others = projects[:self.TOP_PROJECTS], projects[self.TOP_PROJECTS:]
+
+        # define the names, cost, and benefits for the bar chart
+        names = [p.name[:15] + '...' if len(p.name) > 15 else p.name for p in projects]
+        costs = [p.cost for p in projects]
+        benefits = [p.benefit * 1000 for p in projects]
+        if others:
+            names.append(f'Others ({len(others)})')
+            costs.append(sum(p.cost for p in others))
+            benefits.append(sum(p.benefit for p in others) * 1000)
+
+        return self.comparison_chart.update(names, [('Cost (₱)', costs, '#4169E1', 0.7),
+                                                    ('Benefit (×1000)', benefits, '#32CD32', 0.7)])
+
+    # the emergency priority distribution bar chart
+    def _update_priority_distribution(self, solution, emergency_mode):
+        if not emergency_mode:
+            return self.priority_chart.show_message('Emergency mode not enabled', self.priority_chart.title)
+
+        priority_counts = defaultdict(int)
+        for project in solution.selected_projects:
+            if project.is_emergency_priority:
+                priority_counts[f"Priority {project.emergency_priority_level}"] += 1
+            else:
+                priority_counts["Normal"] += 1 # normal priority projects
+
+        priorities = list(priority_counts.keys())
+        counts = list(priority_counts.values())
+        return self.priority_chart.update(priorities, [(None, counts, self.PRIORITY_COLORS[:len(priorities)], None)])
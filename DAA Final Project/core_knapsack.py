@@ -0,0 +1,249 @@
+# this file implements a core-based solver for very large portfolios, in the style of pisinger's expknap
+# in the best selection almost every project agrees with the greedy fill in ratio order, the ones that do
+# not are close to the break project (the first one that no longer fits). so the break project is found
+# without sorting, only a small core of projects around it is solved exactly, and every project outside
+# the core is proven to keep its greedy decision. the core is made larger until that proof holds
+
+# import the necessary libraries
+import time
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from project_set import ProjectSet
+from branch_and_bound import BranchAndBound, Solution
+
+# algorithmic approach class
+class CoreKnapsack:
+    # projects taken on each side of the break project for the first core
+    CORE_SIZE = 50
+    # tolerance used when comparing bounds, relative to the bound, so rounding errors in the sums of
+    # a large portfolio never fix a project wrongly or keep a proven project in the core
+    EPSILON = 1e-12
+
+    # static method to solve the knapsack problem by solving only the core
+    # the result is exact, the same objective as BranchAndBound.solve_knapsack
+    # time_limit (seconds) and should_stop() stop the core search early, the best selection found so far is returned
+    @staticmethod
+    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False,
+                       time_limit: Optional[float] = None,
+                       should_stop: Optional[Callable[[], bool]] = None) -> Solution:
+        # the cost and the benefit (emergency bonus included) of every project as arrays
+        if isinstance(projects, ProjectSet):
+            costs = projects.costs
+            values = projects.values(emergency_mode)
+            projects = projects.views()
+        else:
+            costs = np.fromiter((project.cost for project in projects), dtype=float, count=len(projects))
+            values = np.fromiter((BranchAndBound._project_value(project, emergency_mode) for project in projects),
+                                 dtype=float, count=len(projects))
+        if not projects:
+            return Solution()
+        ratios = np.divide(values, costs, out=np.zeros(len(costs)), where=costs > 0)
+
+        # a project that costs more than the whole budget can never be chosen
+        candidates = np.flatnonzero(costs <= budget)
+        above, break_index, remaining = CoreKnapsack._find_break(candidates, costs, ratios, budget)
+
+        # every project fits, the greedy fill is the answer
+        if break_index is None:
+            solution = CoreKnapsack._build(projects, above, emergency_mode)
+            solution.preprocessing = {"oversized": len(projects) - len(candidates), "fixed in": len(above),
+                                      "fixed out": 0}
+            return solution
+
+        # the linear programming bound, and how much forcing each project against its greedy decision lowers it
+        break_ratio = ratios[break_index]
+        lp_bound = values[above].sum() + remaining * break_ratio
+        tolerance = CoreKnapsack.EPSILON * max(lp_bound, 1)
+        reduced_costs = np.abs(values - break_ratio * costs)
+        is_above = np.zeros(len(costs), dtype=bool)
+        is_above[above] = True
+        outside = np.zeros(len(costs), dtype=bool)
+        outside[candidates] = True
+
+        # the first core: the projects just before and just after the break project in ratio order
+        below = candidates[~is_above[candidates]]
+        core = np.union1d(CoreKnapsack._closest(above, ratios, CoreKnapsack.CORE_SIZE, last=True),
+                          CoreKnapsack._closest(below, ratios, CoreKnapsack.CORE_SIZE, last=False))
+        core = np.union1d(core, [break_index])
+        deadline = time_limit is not None and time.perf_counter() + time_limit or None
+        states_explored = 0
+        peak_states = 0
+        while True:
+            outside[core] = False
+            fixed_in = np.flatnonzero(outside & is_above)
+            # the core in ratio order, ties in list order
+            core = core[np.lexsort((core, -ratios[core]))]
+            chosen, core_value, explored, peak, stop_reason = CoreKnapsack._solve_core(
+                costs[core], values[core], budget - costs[fixed_in].sum(), tolerance, deadline, should_stop)
+            states_explored += explored
+            peak_states = max(peak_states, peak)
+            objective = values[fixed_in].sum() + core_value
+            if stop_reason:
+                break
+
+            # a project outside the core could only change the answer if the bound with its decision flipped
+            # is still above the best selection, those projects are added to the core, nearest first
+            unproven = np.flatnonzero(outside & (lp_bound - reduced_costs > objective + tolerance))
+            if len(unproven) == 0:
+                break
+            grow = max(len(core), CoreKnapsack.CORE_SIZE)
+            if len(unproven) > grow:
+                unproven = unproven[np.argpartition(reduced_costs[unproven], grow)[:grow]]
+            core = np.union1d(core, unproven)
+
+        solution = CoreKnapsack._build(projects, np.concatenate([fixed_in, core[chosen]]), emergency_mode)
+        solution.nodes_explored = states_explored
+        solution.peak_queue_size = peak_states
+        solution.preprocessing = {"oversized": len(projects) - len(candidates), "fixed in": len(fixed_in),
+                                  "fixed out": len(candidates) - len(fixed_in) - len(core), "core": len(core)}
+        if stop_reason:
+            solution.upper_bound = max(lp_bound, solution.objective)
+            solution.is_optimal = False
+            solution.stop_reason = stop_reason
+        return solution
+
+    # static method to solve the core exactly with dynamic programming over (cost, benefit) states
+    # the projects are in ratio order, after project i every state is a selection of the projects up to i,
+    # a state is dropped when a cheaper or equal state has at least the same benefit, or when the bound of
+    # filling the budget with the projects after i can not beat the best selection found so far
+    # costs can be any positive numbers, the states do not need a table over the budget
+    # returns the positions of the chosen projects, their benefit, the number of states, the most states
+    # kept at once and the stop reason (empty if the core was solved)
+    @staticmethod
+    def _solve_core(costs: np.ndarray, values: np.ndarray, budget: float, tolerance: float,
+                    deadline: Optional[float] = None,
+                    should_stop: Optional[Callable[[], bool]] = None) -> Tuple[List[int], float, int, int, str]:
+        k = len(costs)
+        cum_cost = np.concatenate([[0], np.cumsum(costs)])
+        cum_value = np.concatenate([[0], np.cumsum(values)])
+
+        # the greedy fill is the first selection to beat
+        best_value = 0
+        best = []
+        remaining = budget
+        for i in range(k):
+            if costs[i] <= remaining:
+                best.append(i)
+                best_value += values[i]
+                remaining -= costs[i]
+
+        weights = np.zeros(1)
+        profits = np.zeros(1)
+        ids = np.zeros(1, dtype=int)    # where every live state is kept in the last stage
+        stages = []                     # per project: the parent and the decision of every state after it
+        states_explored = 0
+        peak_states = 1
+        stop_reason = ""
+        for i in range(k):
+            if should_stop is not None and should_stop():
+                stop_reason = "cancelled"
+                break
+            if deadline is not None and time.perf_counter() >= deadline:
+                stop_reason = "time limit"
+                break
+
+            # every state either leaves project i out or takes it, if it still fits
+            fit = np.flatnonzero(weights + costs[i] <= budget)
+            new_weights = np.concatenate([weights, weights[fit] + costs[i]])
+            new_profits = np.concatenate([profits, profits[fit] + values[i]])
+            parents = np.concatenate([ids, ids[fit]])
+            taken = np.concatenate([np.zeros(len(weights), dtype=bool), np.ones(len(fit), dtype=bool)])
+            states_explored += len(new_weights)
+
+            # keep only the states no cheaper state beats: by cost, the best benefit first among equal costs
+            order = np.lexsort((-new_profits, new_weights))
+            sorted_profits = new_profits[order]
+            better = np.concatenate([[True], sorted_profits[1:] > np.maximum.accumulate(sorted_profits)[:-1]])
+            order = order[better]
+            stages.append((parents[order], taken[order]))
+            weights = new_weights[order]
+            profits = new_profits[order]
+
+            # every state is a full selection, the best one is remembered before the bound drops it
+            top = int(np.argmax(profits))
+            if profits[top] > best_value + tolerance:
+                best_value = profits[top]
+                best = (i, top)
+
+            # the dantzig bound of every state over the projects after i
+            start = i + 1
+            stop = np.searchsorted(cum_cost, cum_cost[start] + (budget - weights), side="right") - 1
+            bounds = profits + cum_value[stop] - cum_value[start]
+            partial = stop < k
+            bounds[partial] += ((budget - weights[partial] - (cum_cost[stop[partial]] - cum_cost[start]))
+                                * values[stop[partial]] / costs[stop[partial]])
+            ids = np.flatnonzero(bounds > best_value + tolerance)
+            weights = weights[ids]
+            profits = profits[ids]
+            peak_states = max(peak_states, len(ids))
+            if not len(ids):
+                break
+
+        # walk back from the best state to find the chosen projects
+        if isinstance(best, tuple):
+            stage, index = best
+            chosen = []
+            for i in range(stage, -1, -1):
+                parents, taken = stages[i]
+                if taken[index]:
+                    chosen.append(i)
+                index = parents[index]
+            best = chosen[::-1]
+        return best, float(best_value), states_explored, peak_states, stop_reason
+
+    # static method to find the break project without sorting, by splitting the projects around the median ratio
+    # the order is the greedy order of the branch and bound: highest ratio first, ties in list order
+    # returns the projects before the break project, the break project (None if every project fits)
+    # and the budget those projects leave
+    @staticmethod
+    def _find_break(candidates: np.ndarray, costs: np.ndarray, ratios: np.ndarray,
+                    budget: float) -> Tuple[np.ndarray, Optional[int], float]:
+        above = []
+        remaining = budget
+        while len(candidates):
+            candidate_ratios = ratios[candidates]
+            median = np.partition(candidate_ratios, len(candidates) // 2)[len(candidates) // 2]
+            higher = candidates[candidate_ratios > median]
+
+            # the break project is among the projects with a higher ratio, look there only
+            higher_cost = costs[higher].sum()
+            if higher_cost > remaining:
+                candidates = higher
+                continue
+            above.append(higher)
+            remaining -= higher_cost
+
+            # the projects with the median ratio are taken in list order until one does not fit
+            equal = candidates[candidate_ratios == median]
+            filled = np.cumsum(costs[equal])
+            fits = int(np.searchsorted(filled, remaining, side="right"))
+            if fits < len(equal):
+                above.append(equal[:fits])
+                if fits:
+                    remaining -= filled[fits - 1]
+                return np.concatenate(above), int(equal[fits]), remaining
+            above.append(equal)
+            remaining -= filled[-1]
+            candidates = candidates[candidate_ratios < median]
+        return np.concatenate(above) if above else np.zeros(0, dtype=int), None, remaining
+
+    # static method to pick the count projects closest to the break project
+    # last picks the lowest ratios (the end of the projects before the break), otherwise the highest
+    @staticmethod
+    def _closest(indices: np.ndarray, ratios: np.ndarray, count: int, last: bool) -> np.ndarray:
+        if len(indices) <= count:
+            return indices
+        keys = ratios[indices] if last else -ratios[indices]
+        return indices[np.argpartition(keys, count)[:count]]
+
+    # static method to build the solution from the positions of the selected projects
+    @staticmethod
+    def _build(projects: List[Project], selected: np.ndarray, emergency_mode: bool) -> Solution:
+        selected = [projects[i] for i in selected.tolist()]
+        # only the selected projects are ordered, the rest of the portfolio is never sorted
+        solution = BranchAndBound._build_solution(selected, {id(project) for project in selected}, emergency_mode)
+        solution.engine = "core"
+        return solution
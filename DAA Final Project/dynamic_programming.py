@@ -0,0 +1,110 @@
+# this file implements the dynamic programming algorithm to solve the knapsack problem
+# it only works when the costs are whole pesos or centavos, since the budget is used as a table size
+
+# import the necessary libraries
+from math import gcd, floor
+from typing import List, Optional, Tuple
+import numpy as np
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from branch_and_bound import BranchAndBound, Solution
+
+# algorithmic approach class
+class DynamicProgramming:
+    # the cost scales that are tried, whole pesos first, then centavos
+    COST_SCALES = (1, 100)
+
+    # static method to turn the costs and the budget into whole numbers
+    # returns the integer costs and the integer capacity, or None if the costs are finer than centavos
+    @staticmethod
+    def scale_costs(projects: List[Project], budget: float) -> Optional[Tuple[List[int], int]]:
+        scaled = DynamicProgramming.scale_costs_many(projects, [budget])
+        if scaled is None:
+            return None
+        weights, capacities = scaled
+        return weights, capacities[0]
+
+    # static method to scale the costs once for several budgets
+    # returns the integer costs and one integer capacity per budget, or None if the costs are finer than centavos
+    @staticmethod
+    def scale_costs_many(projects: List[Project], budgets: List[float]) -> Optional[Tuple[List[int], List[int]]]:
+        for scale in DynamicProgramming.COST_SCALES:
+            scaled = [project.cost * scale for project in projects]
+            if all(abs(cost - round(cost)) < 1e-6 for cost in scaled):
+                break
+        else:
+            return None
+
+        weights = [int(round(cost)) for cost in scaled]
+
+        # divide everything by the common factor of the costs, e.g. costs in whole thousands
+        # shrink the table a thousand times without changing which selections fit
+        divisor = 0
+        for weight in weights:
+            divisor = gcd(divisor, weight)
+        divisor = divisor or 1
+        weights = [weight // divisor for weight in weights]
+        capacities = [max(floor(budget * scale / divisor + 1e-9), 0) for budget in budgets]
+        return weights, capacities
+
+    # static method to solve the knapsack problem using dynamic programming
+    @staticmethod
+    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False) -> Solution:
+        return DynamicProgramming.solve_many(projects, [budget], emergency_mode)[0]
+
+    # static method to solve the knapsack problem for several budgets with a single table
+    # the table is filled once up to the largest budget, table[c] already is the best benefit for a
+    # budget of c, so every budget only needs its own walk back through the kept bits
+    @staticmethod
+    def solve_many(projects: List[Project], budgets: List[float], emergency_mode: bool = False) -> List[Solution]:
+        # use the same order as the branch and bound so ties are broken the same way
+        sorted_projects = BranchAndBound._search_order(projects, emergency_mode)
+
+        # if there are no projects, every budget gets an empty solution
+        n = len(sorted_projects)
+        if n == 0 or not budgets:
+            return [Solution() for _ in budgets]
+
+        scaled = DynamicProgramming.scale_costs_many(sorted_projects, budgets)
+        if scaled is None:
+            raise ValueError("Dynamic programming needs costs in whole pesos or centavos.")
+        weights, capacities = scaled
+        capacity = max(capacities)
+
+        # table[c] is the best benefit that can be bought with a budget of c
+        table = np.zeros(capacity + 1)
+        # for every project, one bit per budget telling if taking the project improved the table
+        # the bits are packed 8 per byte, that is all we need to rebuild the selection
+        keep = [None] * n
+
+        for i, project in enumerate(sorted_projects):
+            weight = weights[i]
+            if weight > capacity:
+                continue
+            value = BranchAndBound._project_value(project, emergency_mode)
+
+            # take the project on top of the best selection that leaves room for it
+            candidate = table[:capacity + 1 - weight] + value
+            improved = candidate > table[weight:]
+            table[weight:] = np.where(improved, candidate, table[weight:])
+            keep[i] = np.packbits(improved)
+
+        # only the chosen projects of every budget are sorted for its solution, not the whole portfolio
+        positions = {id(project): i for i, project in enumerate(projects)}
+        solutions = []
+        for remaining in capacities:
+            # walk back from this budget to find the selected projects
+            chosen = []
+            for i in range(n - 1, -1, -1):
+                if keep[i] is None or weights[i] > remaining:
+                    continue
+                bit = remaining - weights[i]
+                if (keep[i][bit >> 3] >> (7 - (bit & 7))) & 1:
+                    chosen.append(sorted_projects[i])
+                    remaining -= weights[i]
+
+            solution = BranchAndBound._build_chosen(chosen, positions, emergency_mode)
+            solution.engine = "dynamic_programming"
+            solutions.append(solution)
+        return solutions
@@ -0,0 +1,149 @@
+# this file implements the meet-in-the-middle algorithm (horowitz and sahni) to solve the knapsack problem
+# the projects are split into two halves and every selection of each half is listed, so it works with any
+# costs (no table over the budget) and its running time does not depend on how hard the bound finds the
+# portfolio, only on the number of projects: about 2^(n/2) selections per half
+
+# import the necessary libraries
+import time
+from typing import Callable, List, Optional, Tuple
+import numpy as np
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from project_set import ProjectSet
+from branch_and_bound import BranchAndBound, Solution
+
+# algorithmic approach class
+class MeetInTheMiddle:
+    # the most projects (after removing the ones over the budget) the engine accepts, 2^25 selections per half
+    MAX_PROJECTS = 50
+    # the selections of a half are listed 2^CHUNK_BITS at a time, so a half of 2^25 selections never
+    # has to be in memory at once (2^20 selections take about 24 MB)
+    CHUNK_BITS = 20
+
+    # static method to solve the knapsack problem by meeting in the middle
+    # time_limit (seconds) and should_stop() are checked before every chunk, if the listing is stopped the best
+    # selection matched so far is returned (nothing if the second half was not listed yet) with the stop reason,
+    # this engine has no bound of its own so the upper bound is left to the caller
+    @staticmethod
+    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False,
+                       time_limit: Optional[float] = None,
+                       should_stop: Optional[Callable[[], bool]] = None) -> Solution:
+        # the cost and the benefit (emergency bonus included) of every project
+        if isinstance(projects, ProjectSet):
+            costs = projects.costs
+            values = projects.values(emergency_mode)
+            projects = projects.views()
+        else:
+            costs = np.array([project.cost for project in projects], dtype=float)
+            values = np.array([BranchAndBound._project_value(project, emergency_mode) for project in projects])
+
+        # a project that costs more than the whole budget can never be chosen
+        candidates = np.flatnonzero(costs <= budget)
+        if len(candidates) > MeetInTheMiddle.MAX_PROJECTS:
+            raise ValueError(f"Meet in the middle handles at most {MeetInTheMiddle.MAX_PROJECTS} projects, "
+                             f"got {len(candidates)}.")
+        deadline = time_limit is not None and time.perf_counter() + time_limit or None
+        stop_reason = ""
+
+        # the second half becomes a list of the selections worth keeping: cheapest first, every one better
+        # than all the cheaper ones. the empty selection is always on it, so every first-half selection
+        # within the budget has a partner
+        half = len(candidates) // 2
+        first, second = candidates[:half], candidates[half:]
+        list_costs, list_values, list_masks = np.zeros(1), np.zeros(1), np.zeros(1, dtype=np.int64)
+        explored = 0
+        for chunk_costs, chunk_values, chunk_masks in MeetInTheMiddle._selections(costs[second], values[second]):
+            stop_reason = MeetInTheMiddle._stop_reason(deadline, should_stop)
+            if stop_reason:
+                break
+            explored += len(chunk_costs)
+            within = chunk_costs <= budget
+            list_costs, list_values, list_masks = MeetInTheMiddle._pareto(
+                np.concatenate([list_costs, chunk_costs[within]]),
+                np.concatenate([list_values, chunk_values[within]]),
+                np.concatenate([list_masks, chunk_masks[within]]))
+
+        # every first-half selection is matched with the best second-half selection that fits beside it,
+        # found for a whole chunk at once with a binary search over the costs of the list
+        best_value, best_first, best_second = 0.0, 0, 0
+        for chunk_costs, chunk_values, chunk_masks in MeetInTheMiddle._selections(costs[first], values[first]):
+            stop_reason = stop_reason or MeetInTheMiddle._stop_reason(deadline, should_stop)
+            if stop_reason:
+                break
+            explored += len(chunk_costs)
+            within = np.flatnonzero(chunk_costs <= budget)
+            if not len(within):
+                continue
+            partners = np.searchsorted(list_costs, budget - chunk_costs[within], side="right") - 1
+            # budget - cost can round up, so the pair itself is checked and moved to a cheaper partner if it is
+            # over, the empty selection (cost 0) at the start of the list always fits
+            over = chunk_costs[within] + list_costs[partners] > budget
+            while over.any():
+                partners[over] -= 1
+                over = chunk_costs[within] + list_costs[partners] > budget
+            totals = chunk_values[within] + list_values[partners]
+            top = int(np.argmax(totals))
+            if totals[top] > best_value:
+                best_value = float(totals[top])
+                best_first = int(chunk_masks[within[top]])
+                best_second = int(list_masks[partners[top]])
+
+        chosen = [int(first[bit]) for bit in range(len(first)) if best_first >> bit & 1]
+        chosen += [int(second[bit]) for bit in range(len(second)) if best_second >> bit & 1]
+        solution = BranchAndBound._build_solution(projects, {id(projects[i]) for i in chosen}, emergency_mode)
+        solution.engine = "meet_in_the_middle"
+        solution.nodes_explored = explored
+        solution.peak_queue_size = len(list_costs)
+        solution.preprocessing = {"oversized": len(projects) - len(candidates)}
+        if stop_reason:
+            solution.is_optimal = False
+            solution.stop_reason = stop_reason
+        return solution
+
+    # static method to see if the listing has to stop, returns the stop reason or an empty string
+    @staticmethod
+    def _stop_reason(deadline: Optional[float], should_stop: Optional[Callable[[], bool]]) -> str:
+        if should_stop is not None and should_stop():
+            return "cancelled"
+        if deadline is not None and time.perf_counter() >= deadline:
+            return "time limit"
+        return ""
+
+    # static method to list every selection of a few projects, CHUNK_BITS projects at a time
+    # yields the cost, the benefit and the bitmask (bit i is project i) of every selection of the chunk
+    @staticmethod
+    def _selections(costs: np.ndarray, values: np.ndarray):
+        low = min(len(costs), MeetInTheMiddle.CHUNK_BITS)
+        # every selection of the first low projects, selection k takes the projects of the bits of k
+        low_costs, low_values = MeetInTheMiddle._subset_sums(costs[:low], values[:low])
+        low_masks = np.arange(len(low_costs), dtype=np.int64)
+
+        # the other projects are added on top, one of their selections per chunk
+        high_costs, high_values = MeetInTheMiddle._subset_sums(costs[low:], values[low:])
+        for high, (offset_cost, offset_value) in enumerate(zip(high_costs.tolist(), high_values.tolist())):
+            yield low_costs + offset_cost, low_values + offset_value, low_masks | (high << low)
+
+    # static method to add up the cost and the benefit of every selection of the given projects
+    # the list doubles with every project: the selections without it, then the same ones with it
+    @staticmethod
+    def _subset_sums(costs: np.ndarray, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        sums_cost = np.zeros(1 << len(costs))
+        sums_value = np.zeros(1 << len(costs))
+        size = 1
+        for cost, value in zip(costs.tolist(), values.tolist()):
+            np.add(sums_cost[:size], cost, out=sums_cost[size:2 * size])
+            np.add(sums_value[:size], value, out=sums_value[size:2 * size])
+            size *= 2
+        return sums_cost, sums_value
+
+    # static method to keep only the selections no cheaper (or equally cheap) selection beats
+    # the result is sorted by cost and the benefit goes up with it, so the best selection within any
+    # budget is the last one the budget reaches
+    @staticmethod
+    def _pareto(costs: np.ndarray, values: np.ndarray, masks: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        order = np.lexsort((-values, costs))
+        sorted_values = values[order]
+        better = np.concatenate([[True], sorted_values[1:] > np.maximum.accumulate(sorted_values)[:-1]])
+        order = order[better]
+        return costs[order], values[order], masks[order]
@@ -0,0 +1,152 @@
+# this file keeps the state of the optimizer between solves, so a small change to the project list
+# does not have to be solved from scratch
+
+# import the necessary libraries
+from bisect import bisect_right
+from typing import Callable, List, Optional
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from branch_and_bound import BranchAndBound, Node, PrefixTables, Solution
+from solver import Solver
+from solver_stats import SolveStats
+
+# optimizer session class
+class OptimizerSession:
+    # initialize the session
+    def __init__(self, projects: List[Project] = (), emergency_mode: bool = False):
+        self.reset(projects, emergency_mode)
+
+    # forget everything and start over, needed when the emergency priorities change
+    def reset(self, projects: List[Project], emergency_mode: bool):
+        self.emergency_mode = emergency_mode
+        # the projects in search order and their sort keys, kept sorted as projects come and go
+        self.order = BranchAndBound._search_order(list(projects), emergency_mode)
+        self.keys = [self._key(project) for project in self.order]
+        self.tables = None          # prefix tables, rebuilt lazily after a change
+        # the last solve: its budget, the ids of the selected projects and whether it was proven optimal
+        self.budget = None
+        self.selected = None
+        self.is_optimal = False
+        self.solution = None
+        # changes since the last solve
+        self.added = []
+        self.removed_selected = False
+
+    # the search order key, highest benefit-cost ratio (emergency bonus included) first
+    def _key(self, project: Project) -> float:
+        value = BranchAndBound._project_value(project, self.emergency_mode)
+        return -(project.cost > 0 and value / project.cost or 0)
+
+    # add a project to the session
+    def add_project(self, project: Project):
+        key = self._key(project)
+        position = bisect_right(self.keys, key)
+        self.keys.insert(position, key)
+        self.order.insert(position, project)
+        self.tables = None
+        self.added.append(project)
+
+    # remove a project from the session
+    def remove_project(self, project: Project):
+        for position, other in enumerate(self.order):
+            if other is project:
+                del self.order[position]
+                del self.keys[position]
+                break
+        else:
+            return
+        self.tables = None
+        if project in self.added:
+            self.added = [other for other in self.added if other is not project]
+        if self.selected is not None and id(project) in self.selected:
+            self.selected.discard(id(project))
+            self.removed_selected = True
+
+    # call this after the cost, benefit or priority of a project was edited
+    def update_project(self, project: Project):
+        self.remove_project(project)
+        self.add_project(project)
+
+    # solve for the given budget, reusing the last solve whenever possible
+    # the limits and callbacks are passed on to the search, see BranchAndBound.solve_knapsack
+    def optimize(self, budget: float, time_limit: Optional[float] = None, strategy: str = "best_first",
+                 on_progress: Optional[Callable[[float, float, int], None]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None,
+                 stats: Optional[SolveStats] = None, bound: str = "dantzig", top_k: int = 1) -> Solution:
+        if self.tables is None:
+            self.tables = PrefixTables(self.order, self.emergency_mode)
+
+        # the last selection can only be reused if it was optimal and still fits the budget
+        # the alternatives of top_k are not kept between solves, so they always need a full search
+        if self.selected is None or not self.is_optimal or budget < self.budget or top_k > 1:
+            solution = Solver.solve_knapsack(self.order, budget, self.emergency_mode,
+                                             time_limit=time_limit, strategy=strategy,
+                                             on_progress=on_progress, should_stop=should_stop, stats=stats,
+                                             bound=bound, top_k=top_k)
+            return self._remember(solution, budget)
+
+        # nothing changed, the last solution is still the answer
+        if not self.added and not self.removed_selected and budget == self.budget:
+            return self.solution
+
+        # the last selection (without the removed projects) is a good incumbent to start from
+        incumbent_value = sum(BranchAndBound._project_value(project, self.emergency_mode)
+                              for project in self.order if id(project) in self.selected)
+
+        # if only projects were added, a new search is needed only if a selection with one of them
+        # could beat the last optimum: its benefit plus the bound of filling the rest of the budget
+        if not self.removed_selected and budget == self.budget:
+            needs_search = False
+            for project in self.added:
+                if project.cost > budget:
+                    continue
+                rest = Node(-1, 0, project.cost)
+                bound = BranchAndBound._project_value(project, self.emergency_mode) + \
+                    BranchAndBound._calculate_bound(rest, self.tables, budget)
+                if bound > incumbent_value:
+                    needs_search = True
+                    break
+            if not needs_search:
+                return self._remember(self._build(self.selected), budget)
+
+        # search again, but prune against the last selection from the start
+        root = Node(-1, 0, 0)
+        root.bound = BranchAndBound._bound_function(bound)(root, self.tables, budget, incumbent_value)
+        with SolveStats.phase_of(stats, "search"):
+            result = BranchAndBound._search(root, self.tables, budget, incumbent_value,
+                                            strategy, time_limit=time_limit,
+                                            on_progress=on_progress, should_stop=should_stop, stats=stats,
+                                            bound=bound)
+        selected = self.selected
+        if result.best_node is not None:
+            n = len(self.order)
+            selection = result.best_node.selection(n)
+            selected = {id(self.order[i]) for i in range(n) if selection[i]}
+
+        solution = self._build(selected)
+        solution.stats = stats
+        solution.nodes_explored = result.nodes_explored
+        solution.nodes_pruned = result.nodes_pruned
+        solution.peak_queue_size = result.peak_queue_size
+        if result.stop_reason and result.remaining_bound > solution.objective:
+            solution.upper_bound = result.remaining_bound
+            solution.is_optimal = False
+            solution.stop_reason = result.stop_reason
+        return self._remember(solution, budget)
+
+    # build a solution from the ids of the selected projects
+    def _build(self, selected) -> Solution:
+        solution = BranchAndBound._build_solution(self.order, selected, self.emergency_mode)
+        solution.engine = "branch_and_bound"
+        return solution
+
+    # keep the solution as the starting point for the next solve
+    def _remember(self, solution: Solution, budget: float) -> Solution:
+        self.budget = budget
+        self.selected = {id(project) for project in solution.selected_projects}
+        self.is_optimal = solution.is_optimal
+        self.solution = solution
+        self.added = []
+        self.removed_selected = False
+        return solution
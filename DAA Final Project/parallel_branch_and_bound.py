@@ -0,0 +1,137 @@
+# this file runs the branch and bound search on several processes at once
+# the search tree is cut at a fixed depth and every subtree below the cut is solved by a worker process,
+# the workers share the best objective found so far so each one prunes against the global best
+
+# import the necessary libraries
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from branch_and_bound import BranchAndBound, Node, PrefixTables, Solution
+
+# the tables and the shared best objective of the current worker process, set by _init_worker
+_worker_tables = None
+_worker_shared_best = None
+
+# runs once in every worker process
+def _init_worker(tables, shared_best):
+    global _worker_tables, _worker_shared_best
+    _worker_tables = tables
+    _worker_shared_best = shared_best
+
+# solve one subtree, the root is the node at the cut with the decisions above it already made
+# returns the best profit found below the root, the levels of the projects it took and the nodes explored
+def _solve_subproblem(level, profit, weight, budget, max_profit, strategy, bound="dantzig"):
+    root = Node(level, profit, weight)
+    root.bound = BranchAndBound._bound_function(bound)(root, _worker_tables, budget, max_profit)
+    result = BranchAndBound._search(root, _worker_tables, budget, max_profit, strategy,
+                                    shared_best=_worker_shared_best, bound=bound)
+    if result.best_node is None:
+        return None, [], result.nodes_explored
+
+    n = len(_worker_tables.costs)
+    selection = result.best_node.selection(n)
+    taken = [i for i in range(level + 1, n) if selection[i]]
+    return result.best_node.profit, taken, result.nodes_explored
+
+# algorithmic approach class
+class ParallelBranchAndBound:
+    # how many subproblems to aim for per worker, more subproblems balance the load better
+    SUBPROBLEMS_PER_WORKER = 4
+
+    # static method to solve the knapsack problem with a pool of worker processes
+    # the objective is always the same as BranchAndBound.solve_knapsack, but when several selections tie
+    # any of them can be returned: the workers prune against the best value found by the others, so a tie
+    # found in a later subtree can cut off the same value in an earlier one
+    @staticmethod
+    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False,
+                       workers: Optional[int] = None, split_depth: Optional[int] = None,
+                       strategy: str = "best_first", bound: str = "dantzig") -> Solution:
+        workers = workers or os.cpu_count() or 1
+
+        # sort and preprocess exactly like the serial solver
+        sorted_projects = BranchAndBound._search_order(projects, emergency_mode)
+        if not sorted_projects:
+            return Solution()
+        reduction = BranchAndBound._reduce(sorted_projects, budget, emergency_mode)
+
+        search_projects = reduction.free_projects
+        n = len(search_projects)
+        fixed_value = sum(BranchAndBound._project_value(project, emergency_mode) for project in reduction.fixed_projects)
+        search_budget = budget - sum(project.cost for project in reduction.fixed_projects)
+        tables = PrefixTables(search_projects, emergency_mode)
+
+        # cut deep enough to give every worker a few subproblems
+        if split_depth is None:
+            split_depth = math.ceil(math.log2(workers * ParallelBranchAndBound.SUBPROBLEMS_PER_WORKER))
+        split_depth = min(split_depth, n)
+
+        # the profit to beat starts at the incumbent from the heuristics
+        best_profit = reduction.incumbent_value - fixed_value
+        best_levels = None
+        subproblems = ParallelBranchAndBound._split(tables, search_budget, split_depth, best_profit)
+
+        # a decision prefix is a complete selection too, so the best one can already beat the incumbent
+        for level, profit, weight, levels in subproblems:
+            if profit > best_profit:
+                best_profit = profit
+                best_levels = levels
+
+        # every worker gets the tables once, and the best profit (without the fixed projects) through shared memory
+        shared_best = multiprocessing.Value('d', best_profit)
+        nodes_explored = len(subproblems)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(tables, shared_best)) as executor:
+            futures = [executor.submit(_solve_subproblem, level, profit, weight, search_budget, best_profit, strategy, bound)
+                       for level, profit, weight, levels in subproblems]
+
+            # go through the results in subproblem order so ties are always broken the same way
+            for (level, profit, weight, levels), future in zip(subproblems, futures):
+                sub_profit, taken, sub_nodes = future.result()
+                nodes_explored += sub_nodes
+                if sub_profit is not None and sub_profit > best_profit:
+                    best_profit = sub_profit
+                    best_levels = levels + taken
+
+        # build the solution from the best subtree, or from the incumbent if nothing beat it
+        if best_levels is not None:
+            chosen = {id(project) for project in reduction.fixed_projects}
+            chosen.update(id(search_projects[i]) for i in best_levels)
+        else:
+            chosen = {id(project) for project in reduction.incumbent}
+        solution = BranchAndBound._build_solution(projects, chosen, emergency_mode)
+        solution.engine = "parallel_branch_and_bound"
+        solution.nodes_explored = nodes_explored
+        solution.preprocessing = dict(reduction.removed)
+        return solution
+
+    # static method to enumerate every feasible decision prefix of the first depth projects
+    # returns (level, profit, weight, taken levels) for each prefix whose bound can still beat max_profit
+    @staticmethod
+    def _split(tables: PrefixTables, budget: float, depth: int, max_profit: float):
+        if budget < 0:
+            return []
+
+        subproblems = []
+        # depth-first with the include branch first, the same order the serial dfs visits the tree
+        stack = [(-1, 0, 0, [])]
+        while stack:
+            level, profit, weight, levels = stack.pop()
+            # (a prefix that spends the whole budget has a bound of 0, its own profit still counts)
+            node = Node(level, profit, weight)
+            if max(BranchAndBound._calculate_bound(node, tables, budget), profit) <= max_profit:
+                continue
+            if level + 1 == depth:
+                subproblems.append((level, profit, weight, levels))
+                continue
+
+            next_level = level + 1
+            stack.append((next_level, profit, weight, levels))
+            if weight + tables.costs[next_level] <= budget:
+                stack.append((next_level, profit + tables.values[next_level],
+                              weight + tables.costs[next_level], levels + [next_level]))
+        return subproblems
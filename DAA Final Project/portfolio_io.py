@@ -0,0 +1,246 @@
+# this file imports project portfolios from csv, json lines or parquet files and exports solutions to them
+# the files are read in chunks and every chunk is checked at once with numpy, bad rows are reported
+# and skipped instead of stopping the whole import
+
+# import the necessary libraries
+import csv
+import gc
+import json
+import os
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from branch_and_bound import Solution
+
+# result of an import, the projects that were valid and what was wrong with the others
+class ImportResult:
+    # initialize the result
+    def __init__(self):
+        self.projects = []
+        self.rows_read = 0
+        self.error_count = 0
+        self.errors = []        # (row number, message), the first data row is row 1, only the first few are kept
+
+# portfolio import and export class
+class PortfolioIO:
+    # rows per chunk, big enough for numpy to pay off and small enough to keep memory flat
+    CHUNK_SIZE = 50_000
+    # only this many bad rows are described, the rest are only counted
+    MAX_REPORTED_ERRORS = 1000
+    COLUMNS = ("name", "cost", "benefit", "category", "description")
+    REQUIRED_COLUMNS = ("name", "cost", "benefit", "category")
+    FORMATS = {".csv": "csv", ".jsonl": "jsonl", ".ndjson": "jsonl", ".json": "jsonl", ".parquet": "parquet"}
+
+    # static method to find the format of a file from its extension
+    @staticmethod
+    def file_format(path: str) -> str:
+        extension = os.path.splitext(path)[1].lower()
+        if extension not in PortfolioIO.FORMATS:
+            raise ValueError(f"Unsupported file type '{extension}', use .csv, .jsonl or .parquet.")
+        return PortfolioIO.FORMATS[extension]
+
+    # static method to import the projects of a file
+    # on_chunk is called after every chunk with the number of rows read so far
+    @staticmethod
+    def import_projects(path: str, chunk_size: Optional[int] = None,
+                        on_chunk: Optional[Callable[[int], None]] = None) -> ImportResult:
+        result = ImportResult()
+        readers = {"csv": PortfolioIO._read_csv, "jsonl": PortfolioIO._read_jsonl, "parquet": PortfolioIO._read_parquet}
+        reader = readers[PortfolioIO.file_format(path)]
+
+        # creating a million projects makes the garbage collector scan the growing list over and over,
+        # none of them can be part of a reference cycle, so the collector is paused until the import is done
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            for columns, bad_rows in reader(path, chunk_size or PortfolioIO.CHUNK_SIZE):
+                # bad_rows are the rows the reader could not even split into columns, they do not count in the chunk
+                for row, message in bad_rows:
+                    PortfolioIO._report(result, row, message)
+                PortfolioIO._validate_chunk(columns, result)
+                last_rows = columns["row"][-1:] + [row for row, message in bad_rows[-1:]]
+                if last_rows:
+                    result.rows_read = max(last_rows)
+                if on_chunk:
+                    on_chunk(result.rows_read)
+        finally:
+            if collecting:
+                gc.enable()
+        return result
+
+    # static method to remember a bad row
+    @staticmethod
+    def _report(result: ImportResult, row: int, message: str):
+        result.error_count += 1
+        if len(result.errors) < PortfolioIO.MAX_REPORTED_ERRORS:
+            result.errors.append((row, message))
+
+    # static method to turn a column into floats, values that are not numbers become nan
+    # booleans (true and false in json) are not numbers either, even though python would read them as 1 and 0
+    @staticmethod
+    def _to_floats(values: List) -> np.ndarray:
+        try:
+            return np.array([np.nan if value is None or value == "" or isinstance(value, (bool, np.bool_)) else value
+                             for value in values], dtype=float)
+        except (TypeError, ValueError):
+            # at least one value is not a number, convert them one by one
+            floats = np.empty(len(values))
+            for i, value in enumerate(values):
+                try:
+                    floats[i] = np.nan if isinstance(value, (bool, np.bool_)) else float(value)
+                except (TypeError, ValueError):
+                    floats[i] = np.nan
+            return floats
+
+    # static method to check a chunk and build the projects of the valid rows
+    # columns maps every column name to a list of values, and "row" to the row numbers
+    @staticmethod
+    def _validate_chunk(columns: Dict[str, List], result: ImportResult):
+        rows = columns["row"]
+        if not rows:
+            return
+        names = [str(name).strip() if name is not None else "" for name in columns["name"]]
+        categories = [str(category).strip() if category is not None else "" for category in columns["category"]]
+        descriptions = [str(description) if description is not None else "" for description in columns["description"]]
+        costs = PortfolioIO._to_floats(columns["cost"])
+        benefits = PortfolioIO._to_floats(columns["benefit"])
+
+        # the same checks as the add project dialog and Project.set_benefit, on the whole chunk at once
+        checks = [
+            (np.array([not name for name in names]), "Project name is missing."),
+            (np.array([not category for category in categories]), "Category is missing."),
+            (~np.isfinite(costs), "Cost is not a number."),
+            (np.isfinite(costs) & (costs <= 0), "Cost must be a positive number."),
+            (~np.isfinite(benefits), "Benefit score is not a number."),
+            (np.isfinite(benefits) & ((benefits < 0) | (benefits > 10)), "Benefit score must be between 0 and 10."),
+        ]
+        invalid = np.zeros(len(rows), dtype=bool)
+        for failed, message in checks:
+            for i in np.flatnonzero(failed & ~invalid):
+                PortfolioIO._report(result, rows[i], message)
+            invalid |= failed
+
+        # every row left passes the project validation, so the projects can be built directly
+        valid = np.flatnonzero(~invalid).tolist()
+        result.projects.extend(map(Project, [names[i] for i in valid], costs[valid].tolist(), benefits[valid].tolist(),
+                                   [categories[i] for i in valid], [descriptions[i] for i in valid]))
+
+    # static method to start an empty chunk
+    @staticmethod
+    def _empty_chunk() -> Dict[str, List]:
+        chunk = {column: [] for column in PortfolioIO.COLUMNS}
+        chunk["row"] = []
+        return chunk
+
+    # static method to read a csv file in chunks, the first line must name the columns
+    @staticmethod
+    def _read_csv(path: str, chunk_size: int) -> Iterator[Tuple[Dict[str, List], List]]:
+        with open(path, newline="", encoding="utf-8-sig") as file:
+            reader = csv.reader(file)
+            header = [column.strip().lower() for column in next(reader, [])]
+            missing = [column for column in PortfolioIO.REQUIRED_COLUMNS if column not in header]
+            if missing:
+                raise ValueError(f"The file is missing the column(s): {', '.join(missing)}.")
+            positions = {column: header.index(column) for column in PortfolioIO.COLUMNS if column in header}
+            width = len(header)
+
+            rows, row_numbers, bad_rows = [], [], []
+            for row_number, row in enumerate(reader, 1):
+                if len(row) != width:
+                    if row:
+                        bad_rows.append((row_number, f"Expected {width} values, found {len(row)}."))
+                    continue
+                rows.append(row)
+                row_numbers.append(row_number)
+                if len(rows) == chunk_size:
+                    yield PortfolioIO._csv_chunk(rows, row_numbers, positions), bad_rows
+                    rows, row_numbers, bad_rows = [], [], []
+            if rows or bad_rows:
+                yield PortfolioIO._csv_chunk(rows, row_numbers, positions), bad_rows
+
+    # static method to turn csv rows into columns, a missing optional column is filled with empty values
+    @staticmethod
+    def _csv_chunk(rows: List[List[str]], row_numbers: List[int], positions: Dict[str, int]) -> Dict[str, List]:
+        transposed = list(zip(*rows))
+        chunk = {column: list(transposed[positions[column]]) if column in positions and rows else [""] * len(rows)
+                 for column in PortfolioIO.COLUMNS}
+        chunk["row"] = row_numbers
+        return chunk
+
+    # static method to read a json lines file in chunks, one json object per line
+    @staticmethod
+    def _read_jsonl(path: str, chunk_size: int) -> Iterator[Tuple[Dict[str, List], List]]:
+        with open(path, encoding="utf-8") as file:
+            chunk, bad_rows = PortfolioIO._empty_chunk(), []
+            for row_number, line in enumerate(file, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    bad_rows.append((row_number, "Line is not valid JSON."))
+                    continue
+                if not isinstance(record, dict):
+                    bad_rows.append((row_number, "Line is not a JSON object."))
+                    continue
+                chunk["row"].append(row_number)
+                for column in PortfolioIO.COLUMNS:
+                    chunk[column].append(record.get(column))
+                if len(chunk["row"]) == chunk_size:
+                    yield chunk, bad_rows
+                    chunk, bad_rows = PortfolioIO._empty_chunk(), []
+            if chunk["row"] or bad_rows:
+                yield chunk, bad_rows
+
+    # static method to read a parquet file in chunks, this needs pyarrow
+    @staticmethod
+    def _read_parquet(path: str, chunk_size: int) -> Iterator[Tuple[Dict[str, List], List]]:
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Reading Parquet files needs pyarrow, install it with: pip install pyarrow")
+
+        parquet_file = pq.ParquetFile(path)
+        available = set(parquet_file.schema_arrow.names)
+        missing = [column for column in PortfolioIO.REQUIRED_COLUMNS if column not in available]
+        if missing:
+            raise ValueError(f"The file is missing the column(s): {', '.join(missing)}.")
+        columns = [column for column in PortfolioIO.COLUMNS if column in available]
+
+        first_row = 1
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            chunk = batch.to_pydict()
+            chunk.setdefault("description", [""] * batch.num_rows)
+            chunk["row"] = list(range(first_row, first_row + batch.num_rows))
+            first_row += batch.num_rows
+            yield chunk, []
+
+    # static method to export the selected projects of a solution, in the format of the file extension
+    # the file has the same columns the importer reads, plus the emergency priority of every project
+    @staticmethod
+    def export_solution(solution: Solution, path: str):
+        file_format = PortfolioIO.file_format(path)
+        columns = PortfolioIO.COLUMNS + ("emergency_priority_level",)
+        rows = ((project.name, project.cost, project.benefit, project.category, project.description,
+                 project.emergency_priority_level) for project in solution.selected_projects)
+
+        if file_format == "csv":
+            with open(path, "w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(columns)
+                writer.writerows(rows)
+        elif file_format == "jsonl":
+            with open(path, "w", encoding="utf-8") as file:
+                for row in rows:
+                    file.write(json.dumps(dict(zip(columns, row)), ensure_ascii=False) + "\n")
+        else:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError("Writing Parquet files needs pyarrow, install it with: pip install pyarrow")
+            projects = solution.selected_projects
+            table = pa.table({column: [getattr(project, column) for project in projects] for column in columns})
+            pq.write_table(table, path)
@@ -0,0 +1,155 @@
+# this file shrinks the knapsack problem before the branch and bound starts branching
+
+# import the necessary libraries
+from typing import List, Optional
+
+# import the project class from project.py (must be in the same directory as this file)
+from project import Project
+
+# result of the preprocessing, this holds what is left for the search
+class PreprocessResult:
+    # initialize the result
+    def __init__(self):
+        self.free_projects = []     # projects the search still has to decide on, in search order
+        self.fixed_projects = []    # projects that are part of every better selection
+        self.incumbent = []         # the best selection found by the heuristics
+        self.incumbent_value = 0
+        # how many projects each step removed from the search
+        self.removed = {"oversized": 0, "dominated": 0, "fixed in": 0, "fixed out": 0}
+
+# preprocessing class
+class Preprocessor:
+    # tolerance used when comparing bounds, so rounding errors never fix a project wrongly
+    EPSILON = 1e-9
+
+    # static method to run every preprocessing step
+    # the projects must be in search order (highest benefit-cost ratio first) and values[i] is the
+    # benefit of projects[i] with the emergency bonus already added
+    # incumbent is an optional selection known to fit the budget (e.g. the optimum of a smaller budget),
+    # it replaces the heuristic one when it is worth more, so the reduced-cost test fixes more projects
+    # dominating_costs can be passed in from Preprocessor.dominating_costs when the same projects are reduced
+    # for several budgets, they do not depend on the budget
+    @staticmethod
+    def reduce(projects: List[Project], values: List[float], budget: float,
+               incumbent: Optional[List[Project]] = None, incumbent_value: float = 0,
+               dominating_costs: Optional[List[float]] = None) -> PreprocessResult:
+        result = PreprocessResult()
+
+        # step 1: a project that costs more than the whole budget can never be chosen
+        if dominating_costs is None:
+            dominating_costs = Preprocessor.dominating_costs(projects, values)
+        fits = [project.cost <= budget for project in projects]
+        items = [(project, value) for project, value, fit in zip(projects, values, fits) if fit]
+        dominating_costs = [cost for cost, fit in zip(dominating_costs, fits) if fit]
+        result.removed["oversized"] = len(projects) - len(items)
+
+        # step 2: seed the incumbent with the greedy selection or the best single project
+        Preprocessor._seed_incumbent(result, items, budget)
+        if incumbent is not None and incumbent_value > result.incumbent_value:
+            result.incumbent = list(incumbent)
+            result.incumbent_value = incumbent_value
+
+        # step 3: remove projects that are dominated by cheaper, better projects of the same category
+        kept = Preprocessor._remove_dominated(items, budget, dominating_costs)
+        result.removed["dominated"] = len(items) - len(kept)
+
+        # step 4: fix the projects whose reduced cost proves their decision
+        Preprocessor._fix_by_reduced_cost(result, kept, budget)
+        return result
+
+    # static method to find a good first selection, so the search can prune from the start
+    @staticmethod
+    def _seed_incumbent(result, items, budget):
+        # greedy: walk the projects in ratio order and take every one that still fits
+        greedy = []
+        greedy_value = 0
+        remaining = budget
+        for project, value in items:
+            if project.cost <= remaining:
+                greedy.append(project)
+                greedy_value += value
+                remaining -= project.cost
+
+        # best single project, it wins when one expensive project is worth more than the greedy fill
+        best_single = max(items, key=lambda item: item[1], default=None)
+        if best_single is not None and best_single[1] > greedy_value:
+            result.incumbent = [best_single[0]]
+            result.incumbent_value = best_single[1]
+        else:
+            result.incumbent = greedy
+            result.incumbent_value = greedy_value
+
+    # static method to remove dominated projects
+    # a project is dominated by another project of the same category that costs no more and gives at
+    # least the same benefit. a dominated project is only worth taking together with all the projects
+    # that dominate it (otherwise swapping it for one of them is never worse), so it is removed when it
+    # can not fit in the budget together with all of them
+    @staticmethod
+    def _remove_dominated(items, budget, dominating_costs):
+        return [item for item, dominating_cost in zip(items, dominating_costs)
+                if dominating_cost + item[0].cost <= budget]
+
+    # static method to find the total cost of the projects that dominate each project
+    # the projects that dominate a project cost no more than it, so this is the same whatever the budget
+    @staticmethod
+    def dominating_costs(projects: List[Project], values: List[float]) -> List[float]:
+        costs = [0] * len(projects)
+        by_category = {}
+        for index, project in enumerate(projects):
+            by_category.setdefault(project.category, []).append(index)
+
+        for indices in by_category.values():
+            # cheapest first, then highest benefit, so every dominating project comes before the projects it dominates
+            indices.sort(key=lambda i: (projects[i].cost, -values[i], i))
+            # rank the benefits so the running cost of the better projects can be kept in a fenwick tree
+            ranks = {value: rank for rank, value in enumerate(sorted({values[i] for i in indices}, reverse=True), 1)}
+            tree = [0] * (len(ranks) + 1)
+
+            for i in indices:
+                # total cost of the projects seen so far with a benefit at least this high
+                rank = ranks[values[i]]
+                while rank > 0:
+                    costs[i] += tree[rank]
+                    rank -= rank & -rank
+
+                rank = ranks[values[i]]
+                while rank < len(tree):
+                    tree[rank] += projects[i].cost
+                    rank += rank & -rank
+        return costs
+
+    # static method to fix projects with the reduced-cost test against the linear programming bound
+    # with r the ratio of the break project, forcing project j against its greedy decision lowers the
+    # bound by at least |value_j - r * cost_j|; if that drops below the incumbent, the decision is fixed
+    @staticmethod
+    def _fix_by_reduced_cost(result, items, budget):
+        # find the break project, the first one in ratio order that no longer fits
+        used = 0
+        lp_bound = 0
+        break_index = len(items)
+        for index, (project, value) in enumerate(items):
+            if used + project.cost > budget:
+                break_index = index
+                break
+            used += project.cost
+            lp_bound += value
+
+        # every project fits, the whole list is the answer
+        if break_index == len(items):
+            result.fixed_projects = [project for project, _ in items]
+            result.removed["fixed in"] = len(items)
+            return
+
+        break_project, break_value = items[break_index]
+        ratio = break_value / break_project.cost
+        lp_bound += (budget - used) * ratio
+
+        for index, (project, value) in enumerate(items):
+            reduced_cost = abs(value - ratio * project.cost)
+            if index == break_index or lp_bound - reduced_cost >= result.incumbent_value - Preprocessor.EPSILON:
+                result.free_projects.append(project)
+            elif index < break_index:
+                result.fixed_projects.append(project)
+                result.removed["fixed in"] += 1
+            else:
+                result.removed["fixed out"] += 1
@@ -1,10 +1,44 @@
 # this file will handle everything there is to handle in a project
 
+# import the necessary libraries
+import itertools
+
+# priority level of every category during an emergency, 1 is the most urgent
+BASE_PRIORITIES = {
+    "infrastructure": 1,
+    "health": 2,
+    "social services": 3,
+    "environment": 4,
+    "education": 5, 
+    "economic development": 5
+}
+
+# the categories that move up for each type of emergency, the rest keep their base priority
+# if the emergency is health related, always put health first
+HEALTH_PRIORITIES = {"health": 1, "social services": 2, "infrastructure": 3}
+# group all the non-health related emergencies, infrastructure have the highest priority
+DISASTER_PRIORITIES = {"infrastructure": 1, "social services": 2, "health": 3}
+EMERGENCY_PRIORITIES = {
+    "health crisis": HEALTH_PRIORITIES,
+    "typhoon": DISASTER_PRIORITIES,
+    "earthquake": DISASTER_PRIORITIES,
+    "flood": DISASTER_PRIORITIES,
+    "fire": DISASTER_PRIORITIES
+}
+
+# (emergency type, category) -> priority level, worked out once so setting a priority is a single lookup
+PRIORITY_TABLE = {(emergency_type, category): priorities.get(category, base_level)
+                  for emergency_type, priorities in EMERGENCY_PRIORITIES.items()
+                  for category, base_level in BASE_PRIORITIES.items()}
+
 # project class
 class Project:
+    # every project gets its own id, it stays the same even when the project is renamed or edited
+    _next_id = itertools.count(1)
     
     # initialize a project's information
     def __init__(self, name, cost, benefit, category, description=""):
+        self.project_id = next(Project._next_id)
         self.name = name
         self.cost = cost
         self.set_benefit(benefit)  # this is used to validate the benefit score
@@ -25,47 +59,21 @@ class Project:
         self.benefit = benefit
         self.benefit_cost_ratio = self.cost > 0 and benefit / self.cost or 0
     
+    # static method to look up the priority level of a category during an emergency
+    @staticmethod
+    def priority_level(category, emergency_type=None):
+        category_lower = category.lower()
+        emergency_type_lower = emergency_type.lower() if emergency_type else None
+        level = PRIORITY_TABLE.get((emergency_type_lower, category_lower))
+        if level is None:
+            level = BASE_PRIORITIES.get(category_lower, 5) # if the emergency type or the category is not specifically handled
+        return level
+
     # handling emergency situations
     def set_emergency_priority(self, is_emergency, emergency_type=None):
         self.is_emergency_priority = is_emergency
         if is_emergency:
-            base_priorities = {
-                "infrastructure": 1,
-                "health": 2,
-                "social services": 3,
-                "environment": 4,
-                "education": 5, 
-                "economic development": 5
-            }
-            # set priorities if emergency mode was enabled
-            category_lower = self.category.lower()
-            if emergency_type:
-                emergency_type_lower = emergency_type.lower()
-
-                # if the emergency is health related, always put health first
-                if emergency_type_lower == "health crisis":
-                    if category_lower == "health":
-                        self.emergency_priority_level = 1
-                    elif category_lower == "social services":
-                        self.emergency_priority_level = 2
-                    elif category_lower == "infrastructure":
-                        self.emergency_priority_level = 3
-                    else:
-                        self.emergency_priority_level = base_priorities.get(category_lower, 5) # priority level of the rest of the sectors
-                # group all the non-health related emergencies
-                elif emergency_type_lower in ["typhoon", "earthquake", "flood", "fire"]: 
-                    if category_lower == "infrastructure":
-                        self.emergency_priority_level = 1  # infrastructure have the highest priority
-                    elif category_lower == "social services":
-                        self.emergency_priority_level = 2
-                    elif category_lower == "health":
-                        self.emergency_priority_level = 3
-                    else:
-                        self.emergency_priority_level = base_priorities.get(category_lower, 5) # priority level of the rest of the sectors
-                else:
-                    self.emergency_priority_level = base_priorities.get(category_lower, 5) # if emergency type is not specifically handled
-            else:
-                self.emergency_priority_level = base_priorities.get(category_lower, 5) # just in case the emergency type was not provided due to other unforseen bugs
+            self.emergency_priority_level = Project.priority_level(self.category, emergency_type)
         else: 
             self.emergency_priority_level = 5 # if not emergency
 
@@ -73,3 +81,23 @@ class Project:
     def __str__(self):
         emergency_status = f" [EMERGENCY PRIORITY: {self.emergency_priority_level}]" if self.is_emergency_priority else ""
         return f"Project: {self.name} | Cost: ₱{self.cost:.2f} | Benefit: {self.benefit:.2f} | Ratio: {self.benefit_cost_ratio:.3f} | Category: {self.category}{emergency_status}"
+
+# set the emergency priorities of many projects at once
+# the level only depends on the category, so it is looked up once per category instead of once per project
+# a ProjectSet is updated on its arrays
+def apply_emergency_priorities(projects, emergency_type=None, is_emergency=True):
+    from project_set import ProjectSet
+    if isinstance(projects, ProjectSet):
+        projects.set_emergency_priority(is_emergency, emergency_type)
+        return
+
+    levels = {}
+    for project in projects:
+        if is_emergency:
+            level = levels.get(project.category)
+            if level is None:
+                level = levels[project.category] = Project.priority_level(project.category, emergency_type)
+        else:
+            level = 5 # if not emergency
+        project.is_emergency_priority = is_emergency
+        project.emergency_priority_level = level
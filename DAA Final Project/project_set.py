@@ -0,0 +1,167 @@
+# this file stores a large portfolio of projects column by column instead of as one object per project
+# the numbers live in numpy arrays and the texts in one packed buffer per column, which takes about a
+# fifth of the memory of the same projects as Project objects (names included), and lets the solver sort
+# and add them up without going through every project's attributes
+
+# import the necessary libraries
+import itertools
+from typing import Iterator, List, Optional, Sequence
+import numpy as np
+
+# import the project class from project.py (must be in the same directory as this file)
+from project import Project
+
+# a column of texts packed into one utf-8 buffer, text i is buffer[offsets[i]:offsets[i + 1]]
+class StringColumn:
+    __slots__ = ('buffer', 'offsets')
+
+    # initialize the column from a list of texts
+    def __init__(self, texts: Sequence[str]):
+        encoded = [text.encode("utf-8") for text in texts]
+        self.buffer = b"".join(encoded)
+        # 4-byte offsets are enough for buffers up to 2 GB
+        offset_type = np.int32 if len(self.buffer) < 2 ** 31 else np.int64
+        self.offsets = np.zeros(len(encoded) + 1, dtype=offset_type)
+        np.cumsum([len(text) for text in encoded], out=self.offsets[1:])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].decode("utf-8")
+
+# a view of one project of a project set, it reads like a Project so the gui can show it
+class ProjectView:
+    __slots__ = ('project_set', 'index')
+
+    # initialize the view
+    def __init__(self, project_set, index):
+        self.project_set = project_set
+        self.index = index
+
+    @property
+    def project_id(self):
+        return self.project_set.first_id + self.index
+
+    @property
+    def name(self):
+        return self.project_set.names[self.index]
+
+    @property
+    def description(self):
+        return self.project_set.descriptions[self.index]
+
+    @property
+    def category(self):
+        return self.project_set.categories[self.project_set.category_codes[self.index]]
+
+    @property
+    def cost(self):
+        return float(self.project_set.costs[self.index])
+
+    @property
+    def benefit(self):
+        return float(self.project_set.benefits[self.index])
+
+    @property
+    def benefit_cost_ratio(self):
+        return float(self.project_set.ratios[self.index])
+
+    @property
+    def is_emergency_priority(self):
+        return bool(self.project_set.is_emergency[self.index])
+
+    @property
+    def emergency_priority_level(self):
+        return int(self.project_set.emergency_levels[self.index])
+
+    def __str__(self):
+        emergency_status = f" [EMERGENCY PRIORITY: {self.emergency_priority_level}]" if self.is_emergency_priority else ""
+        return f"Project: {self.name} | Cost: ₱{self.cost:.2f} | Benefit: {self.benefit:.2f} | Ratio: {self.benefit_cost_ratio:.3f} | Category: {self.category}{emergency_status}"
+
+# project set class
+class ProjectSet:
+    # initialize the set, the same checks as Project are done on the whole arrays at once
+    def __init__(self, names: Sequence[str], costs: Sequence[float], benefits: Sequence[float],
+                 categories: Sequence[str], descriptions: Optional[Sequence[str]] = None):
+        n = len(names)
+        self.costs = np.asarray(costs, dtype=np.float64)
+        self.benefits = np.asarray(benefits, dtype=np.float64)
+        if len(self.costs) != n or len(self.benefits) != n or len(categories) != n:
+            raise ValueError("Every column of a project set needs one value per project.")
+
+        # benefit score conditions
+        if n and self.benefits.max() > 10:
+            raise ValueError(f"Benefit score cannot exceed 10. Current value: {self.benefits.max()}")
+        if n and self.benefits.min() < 0:
+            raise ValueError(f"Benefit score cannot be negative. Current value: {self.benefits.min()}")
+
+        self.names = StringColumn(names)
+        self.descriptions = StringColumn(descriptions if descriptions is not None else [""] * n)
+        self.ratios = np.divide(self.benefits, self.costs, out=np.zeros(n), where=self.costs > 0)
+
+        # the categories are stored once, every project only keeps the code of its category
+        self.categories, codes = np.unique(np.asarray(categories, dtype=object), return_inverse=True)
+        self.categories = list(self.categories)
+        self.category_codes = codes.astype(np.int16)
+
+        self.is_emergency = np.zeros(n, dtype=bool)
+        self.emergency_levels = np.full(n, 5, dtype=np.int8)  # default lowest priority
+
+        # reserve a block of project ids, so the rows of a set never clash with single projects
+        self.first_id = next(Project._next_id)
+        Project._next_id = itertools.count(self.first_id + n)
+
+    # static method to build a set from a list of projects, their emergency priorities are kept
+    @staticmethod
+    def from_projects(projects: List[Project]) -> "ProjectSet":
+        project_set = ProjectSet([project.name for project in projects], [project.cost for project in projects],
+                                 [project.benefit for project in projects], [project.category for project in projects],
+                                 [project.description for project in projects])
+        project_set.is_emergency[:] = [project.is_emergency_priority for project in projects]
+        project_set.emergency_levels[:] = [project.emergency_priority_level for project in projects]
+        return project_set
+
+    def __len__(self):
+        return len(self.costs)
+
+    def __getitem__(self, index: int) -> ProjectView:
+        return ProjectView(self, index)
+
+    def __iter__(self) -> Iterator[ProjectView]:
+        return iter(self.views())
+
+    # views of the given projects (all of them by default)
+    # the solvers tell projects apart by identity, so they keep one list of views for a whole solve
+    def views(self, indices: Optional[Sequence[int]] = None) -> List[ProjectView]:
+        if indices is None:
+            indices = range(len(self))
+        return [ProjectView(self, index) for index in indices]
+
+    # set the emergency priorities of every project from the priority table in project.py
+    def set_emergency_priority(self, is_emergency: bool, emergency_type: Optional[str] = None):
+        self.is_emergency[:] = is_emergency
+        if not is_emergency:
+            self.emergency_levels[:] = 5
+            return
+
+        # the level only depends on the category, so it is worked out once per category
+        levels = np.empty(len(self.categories), dtype=np.int8)
+        for code, category in enumerate(self.categories):
+            levels[code] = Project.priority_level(category, emergency_type)
+        self.emergency_levels[:] = levels[self.category_codes]
+
+    # the benefit of every project, with the emergency bonus added if emergency mode is on
+    # (the same numbers as BranchAndBound._project_value)
+    def values(self, emergency_mode: bool) -> np.ndarray:
+        if not emergency_mode:
+            return self.benefits
+        return self.benefits + np.where(self.is_emergency, (6 - self.emergency_levels) * 0.5, 0)
+
+    # the indices of the projects in search order, the same order as BranchAndBound._search_order
+    def search_order(self, emergency_mode: bool) -> np.ndarray:
+        if emergency_mode:
+            ratios = np.divide(self.values(True), self.costs, out=np.zeros(len(self)), where=self.costs > 0)
+        else:
+            ratios = self.ratios
+        return np.argsort(-ratios, kind="stable")
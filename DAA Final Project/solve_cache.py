@@ -0,0 +1,161 @@
+# this file remembers solved problems, so pressing optimize again with the same projects and budget
+# (or switching emergency mode back) returns the earlier solution right away
+# the most recent solutions are kept in memory, and optionally in a sqlite file that survives restarts
+
+# import the necessary libraries
+import hashlib
+import json
+import sqlite3
+import struct
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from project_set import ProjectSet
+from branch_and_bound import BranchAndBound, Solution
+
+# solve cache class
+class SolveCache:
+    # how many solutions are kept in memory and in the file
+    MAX_ENTRIES = 64
+    MAX_DISK_ENTRIES = 1000
+
+    # initialize the cache, path is the sqlite file of the disk tier (None keeps everything in memory)
+    def __init__(self, max_entries: Optional[int] = None, path: Optional[str] = None,
+                 max_disk_entries: Optional[int] = None):
+        self.max_entries = max_entries or SolveCache.MAX_ENTRIES
+        self.max_disk_entries = max_disk_entries or SolveCache.MAX_DISK_ENTRIES
+        self.entries = OrderedDict()    # key -> stored solution, the least recently used first
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        # the disk tier is optional, if the file can not be opened the cache simply stays in memory
+        self.connection = None
+        if path:
+            try:
+                self.connection = sqlite3.connect(path)
+                self.connection.execute("CREATE TABLE IF NOT EXISTS solutions "
+                                        "(key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)")
+                self.connection.commit()
+            except sqlite3.Error:
+                self.connection = None
+
+    # static method to hash everything the solution depends on
+    # the order of the projects is part of the key, since it decides which of two equal selections is returned
+    @staticmethod
+    def fingerprint(projects: List[Project], budget: float, emergency_mode: bool, emergency_type: Optional[str] = None) -> str:
+        digest = hashlib.sha256()
+        digest.update(struct.pack("<d?", budget, emergency_mode))
+        digest.update((emergency_type or "").encode("utf-8") if emergency_mode else b"")
+
+        if isinstance(projects, ProjectSet):
+            # a project set is hashed straight from its arrays
+            for column in (projects.costs, projects.benefits, projects.is_emergency, projects.emergency_levels,
+                           projects.category_codes, projects.names.offsets):
+                digest.update(column.tobytes())
+            digest.update(projects.names.buffer)
+            digest.update("\0".join(projects.categories).encode("utf-8"))
+        else:
+            for project in projects:
+                digest.update(struct.pack("<dd?b", project.cost, project.benefit,
+                                          project.is_emergency_priority, project.emergency_priority_level))
+                digest.update(f"{project.name}\0{project.category}\0".encode("utf-8"))
+        return digest.hexdigest()
+
+    # look up a solution, returns None if the problem was not solved before
+    def get(self, key: str, projects: List[Project], emergency_mode: bool) -> Optional[Solution]:
+        stored = self.entries.get(key)
+        if stored is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        else:
+            stored = self._load(key)
+            if stored is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, stored)
+        return self._rebuild(stored, projects, emergency_mode)
+
+    # store a solution, only proven optimal solutions are kept since a stopped search may do better next time
+    def put(self, key: str, projects: List[Project], solution: Solution):
+        if not solution.is_optimal:
+            return
+
+        # the selection is stored as positions in the project list, they stay valid across restarts
+        if isinstance(projects, ProjectSet):
+            selected = sorted(project.index for project in solution.selected_projects)
+        else:
+            chosen = {id(project) for project in solution.selected_projects}
+            selected = [index for index, project in enumerate(projects) if id(project) in chosen]
+        stored = {
+            "selected": selected,
+            "engine": solution.engine,
+            "nodes_explored": solution.nodes_explored,
+            "peak_queue_size": solution.peak_queue_size,
+            "preprocessing": solution.preprocessing,
+        }
+        self._remember(key, stored)
+        self._save(key, stored)
+
+    # forget every solution, in memory and on disk
+    def clear(self):
+        self.entries.clear()
+        if self.connection is not None:
+            self.connection.execute("DELETE FROM solutions")
+            self.connection.commit()
+
+    # a short summary of the cache for the status bar
+    def summary(self) -> str:
+        return f"cache hits: {self.hits + self.disk_hits} ({self.disk_hits} from disk), misses: {self.misses}"
+
+    # keep a solution in memory, the least recently used one is dropped when the cache is full
+    def _remember(self, key: str, stored: dict):
+        self.entries[key] = stored
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    # read a solution from the disk tier
+    def _load(self, key: str) -> Optional[dict]:
+        if self.connection is None:
+            return None
+        try:
+            row = self.connection.execute("SELECT value FROM solutions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self.connection.execute("UPDATE solutions SET last_used = ? WHERE key = ?", (time.time(), key))
+            self.connection.commit()
+            return json.loads(row[0])
+        except (sqlite3.Error, ValueError):
+            return None
+
+    # write a solution to the disk tier, the least recently used rows are dropped when the file is full
+    def _save(self, key: str, stored: dict):
+        if self.connection is None:
+            return
+        try:
+            self.connection.execute("INSERT OR REPLACE INTO solutions (key, value, last_used) VALUES (?, ?, ?)",
+                                    (key, json.dumps(stored), time.time()))
+            self.connection.execute("DELETE FROM solutions WHERE key NOT IN "
+                                    "(SELECT key FROM solutions ORDER BY last_used DESC LIMIT ?)",
+                                    (self.max_disk_entries,))
+            self.connection.commit()
+        except sqlite3.Error:
+            pass
+
+    # static method to turn a stored selection back into a solution for the given projects
+    @staticmethod
+    def _rebuild(stored: dict, projects: List[Project], emergency_mode: bool) -> Solution:
+        if isinstance(projects, ProjectSet):
+            projects = projects.views()
+        chosen = {id(projects[index]) for index in stored["selected"]}
+        solution = BranchAndBound._build_solution(projects, chosen, emergency_mode)
+        solution.engine = stored["engine"]
+        solution.nodes_explored = stored["nodes_explored"]
+        solution.peak_queue_size = stored["peak_queue_size"]
+        solution.preprocessing = dict(stored["preprocessing"])
+        return solution
@@ -0,0 +1,149 @@
+# this file picks the best algorithm for a given set of projects and budget
+
+# import the necessary libraries
+import time
+from typing import Callable, List, Optional
+
+# import the classes from other files (the files should be in the same directory)
+from project import Project
+from project_set import ProjectSet
+from branch_and_bound import BranchAndBound, Solution
+from dynamic_programming import DynamicProgramming
+from parallel_branch_and_bound import ParallelBranchAndBound
+from core_knapsack import CoreKnapsack
+from meet_in_the_middle import MeetInTheMiddle
+from solver_stats import SolveStats
+
+# dispatcher class
+class Solver:
+    # below this many projects the branch and bound is always fast enough
+    SMALL_PORTFOLIO = 20
+    # the largest dynamic programming table (projects x budget steps) we are willing to fill
+    DP_CELL_LIMIT = 50_000_000
+    # from this many projects on only a core around the break project is searched
+    LARGE_PORTFOLIO = 5_000
+    # up to this many projects, a branch and bound that gets stuck on ties is handed to meet in the middle
+    # (2^22 selections per half, a few seconds)
+    MEET_IN_THE_MIDDLE_LIMIT = 44
+    # the fewest nodes the branch and bound gets before meet in the middle takes over
+    MIN_NODES_BEFORE_MEETING = 50_000
+    # the share of the time limit the branch and bound gets before meet in the middle takes over,
+    # so a hard portfolio still has time left for the exact listing
+    SEARCH_SHARE_BEFORE_MEETING = 0.5
+
+    # static method to choose the algorithm from the number of projects, the budget and the cost granularity
+    @staticmethod
+    def choose_engine(projects: List[Project], budget: float) -> str:
+        n = len(projects)
+        if n < Solver.SMALL_PORTFOLIO:
+            return "branch_and_bound"
+
+        # the dynamic programming table needs whole-peso or centavo costs
+        large = "core" if n >= Solver.LARGE_PORTFOLIO else "branch_and_bound"
+        scaled = DynamicProgramming.scale_costs(projects, budget)
+        if scaled is None:
+            return large
+
+        _, capacity = scaled
+        if n * (capacity + 1) > Solver.DP_CELL_LIMIT:
+            return large
+        return "dynamic_programming"
+
+    # static method to solve the same projects for many budgets, e.g. every budget from ₱1M to ₱10M
+    # returns one solution per budget, in the same order as the budgets
+    # with whole-peso costs a single dynamic programming table covers every budget at once,
+    # otherwise the branch and bound solves the budgets in increasing order, each warm-started by the last
+    @staticmethod
+    def solve_many(projects: List[Project], budgets: List[float], emergency_mode: bool = False) -> List[Solution]:
+        if not budgets:
+            return []
+        if Solver.choose_engine(projects, max(budgets)) == "dynamic_programming":
+            if isinstance(projects, ProjectSet):
+                projects = projects.views()
+            return DynamicProgramming.solve_many(projects, budgets, emergency_mode)
+        return BranchAndBound.solve_many(projects, budgets, emergency_mode)
+
+    # static method to solve the knapsack problem with the chosen algorithm
+    # the limits and the callbacks only apply to the branch and bound, the dynamic programming
+    # table is already kept small enough by DP_CELL_LIMIT
+    # workers > 1 runs the branch and bound on a process pool (without limits or callbacks)
+    # the core engine for large portfolios stops at time_limit or should_stop, the other callbacks are not called
+    # up to MEET_IN_THE_MIDDLE_LIMIT projects (and without max_nodes) the branch and bound gets about as many
+    # nodes as meet in the middle lists selections and SEARCH_SHARE_BEFORE_MEETING of the time limit,
+    # if that is not enough meet in the middle solves it instead with the time that is left
+    # stats is an optional SolveStats that is filled in and attached to the solution
+    # bound is one of BranchAndBound.BOUNDS, it only applies to the branch and bound
+    # approximate returns a selection worth at least (1 - epsilon) times the best score instead, whatever the engine
+    # top_k > 1 always runs the serial branch and bound, it is the only engine that keeps more than the best selection
+    @staticmethod
+    def solve_knapsack(projects: List[Project], budget: float, emergency_mode: bool = False,
+                       time_limit: Optional[float] = None, max_nodes: Optional[int] = None,
+                       on_incumbent: Optional[Callable[[float, float, int], None]] = None,
+                       strategy: str = "best_first", workers: int = 1,
+                       on_progress: Optional[Callable[[float, float, int], None]] = None,
+                       should_stop: Optional[Callable[[], bool]] = None,
+                       stats: Optional[SolveStats] = None, bound: str = "dantzig",
+                       approximate: bool = False, epsilon: float = 0.01, top_k: int = 1) -> Solution:
+        if approximate:
+            return BranchAndBound.solve_knapsack(projects, budget, emergency_mode, stats=stats,
+                                                 approximate=True, epsilon=epsilon)
+        if top_k > 1:
+            return BranchAndBound.solve_knapsack(projects, budget, emergency_mode,
+                                                 time_limit=time_limit, max_nodes=max_nodes,
+                                                 on_incumbent=on_incumbent, strategy=strategy,
+                                                 on_progress=on_progress, should_stop=should_stop, stats=stats,
+                                                 bound=bound, top_k=top_k)
+        engine = Solver.choose_engine(projects, budget)
+        if engine == "core":
+            with SolveStats.phase_of(stats, engine):
+                solution = CoreKnapsack.solve_knapsack(projects, budget, emergency_mode,
+                                                       time_limit=time_limit, should_stop=should_stop)
+            solution.stats = stats
+            return solution
+        # only the serial branch and bound reads a ProjectSet directly, the other engines get its views
+        if isinstance(projects, ProjectSet) and (engine == "dynamic_programming" or workers > 1):
+            projects = projects.views()
+        if engine == "dynamic_programming" or workers > 1:
+            # these engines only report their total time
+            with SolveStats.phase_of(stats, engine if workers == 1 else "parallel_branch_and_bound"):
+                if engine == "dynamic_programming":
+                    solution = DynamicProgramming.solve_knapsack(projects, budget, emergency_mode)
+                else:
+                    solution = ParallelBranchAndBound.solve_knapsack(projects, budget, emergency_mode,
+                                                                     workers=workers, strategy=strategy, bound=bound)
+            solution.stats = stats
+            return solution
+
+        # the branch and bound is quick on most portfolios, but on many equal ratios it can explore far more
+        # nodes than meet in the middle lists selections, which does not care about ties
+        # with a time limit, the branch and bound only gets part of it, and meet in the middle takes over
+        # when it stops at either limit
+        meeting = max_nodes is None and len(projects) <= Solver.MEET_IN_THE_MIDDLE_LIMIT
+        search_limit = time_limit
+        if meeting:
+            max_nodes = max(1 << (len(projects) // 2), Solver.MIN_NODES_BEFORE_MEETING)
+            start = time.perf_counter()
+            if time_limit is not None:
+                search_limit = time_limit * Solver.SEARCH_SHARE_BEFORE_MEETING
+        solution = BranchAndBound.solve_knapsack(projects, budget, emergency_mode,
+                                                 time_limit=search_limit, max_nodes=max_nodes,
+                                                 on_incumbent=on_incumbent, strategy=strategy,
+                                                 on_progress=on_progress, should_stop=should_stop, stats=stats,
+                                                 bound=bound)
+        if meeting and solution.stop_reason in ("node limit", "time limit"):
+            # meet in the middle gets the time the branch and bound left, and stops on cancel as well
+            remaining = None if time_limit is None else max(time_limit - (time.perf_counter() - start), 0)
+            with SolveStats.phase_of(stats, "meet_in_the_middle"):
+                meeting_solution = MeetInTheMiddle.solve_knapsack(projects, budget, emergency_mode,
+                                                                  time_limit=remaining, should_stop=should_stop)
+            if meeting_solution.stop_reason:
+                # keep the better of the two selections, the bound of the branch and bound still holds
+                upper_bound = solution.upper_bound
+                if meeting_solution.objective > solution.objective:
+                    solution = meeting_solution
+                solution.upper_bound = max(upper_bound, solution.objective)
+                solution.stop_reason = meeting_solution.stop_reason
+            else:
+                solution = meeting_solution
+            solution.stats = stats
+        return solution
@@ -0,0 +1,135 @@
+# this file collects statistics about a solve and runs a solve under a profiler
+# pass a SolveStats object to the solver to see where the time goes, it is left out by default
+# so the search loop does not pay for the timers
+
+# import the necessary libraries
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from typing import Callable, Optional
+
+# statistics of one solve, filled in by the solver
+class SolveStats:
+    # initialize the statistics
+    def __init__(self):
+        # how often each thing happened
+        self.counters = {
+            "nodes_explored": 0,
+            "nodes_pruned": 0,
+            "incumbent_updates": 0,
+            "bound_evaluations": 0,
+            "heap_operations": 0,
+        }
+        # seconds spent in every phase of the solve and in the hot functions of the search
+        self.timers = {}
+
+    # add time to a timer
+    def add_time(self, name: str, seconds: float):
+        self.timers[name] = self.timers.get(name, 0) + seconds
+
+    # time a phase of the solve, e.g. with stats.phase("preprocess"): ...
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    # static method to time a phase when statistics were asked for, and do nothing otherwise
+    @staticmethod
+    def phase_of(stats: Optional["SolveStats"], name: str):
+        return stats.phase(name) if stats is not None else nullcontext()
+
+    # wrap a function so every call is counted and timed
+    def timed(self, timer: str, counter: str, function: Callable) -> Callable:
+        clock = time.perf_counter
+        timers = self.timers
+        counters = self.counters
+        timers.setdefault(timer, 0)
+
+        def wrapper(*args):
+            start = clock()
+            result = function(*args)
+            timers[timer] += clock() - start
+            counters[counter] += 1
+            return result
+        return wrapper
+
+    # the statistics as text, for the results area of the gui
+    def report(self) -> str:
+        lines = ["Solver Statistics:"]
+        for name, value in self.counters.items():
+            lines.append(f"  {name.replace('_', ' ')}: {value:,}")
+        total = sum(seconds for name, seconds in self.timers.items() if not name.startswith("search:"))
+        for name, seconds in self.timers.items():
+            share = f" ({seconds / total * 100:.0f}%)" if total > 0 and not name.startswith("search:") else ""
+            lines.append(f"  time in {name}: {seconds:.4f} s{share}")
+        return "\n".join(lines)
+
+# profiler class, runs a solve under cProfile or a simple sampling profiler and writes the results to a file
+class SolverProfiler:
+    MODES = ("cprofile", "sampling")
+    # seconds between two samples of the sampling profiler
+    SAMPLE_INTERVAL = 0.001
+
+    # static method to call function(*args, **kwargs) under the profiler and write the results to output
+    # cprofile writes a pstats file (open it with python -m pstats or snakeviz) and prints the top functions,
+    # sampling writes the sampled stacks in the collapsed format flame graph tools read
+    @staticmethod
+    def run(function: Callable, *args, mode: str = "cprofile", output: Optional[str] = None, **kwargs):
+        if mode not in SolverProfiler.MODES:
+            raise ValueError(f"Unknown profiler: {mode}. Choose from {', '.join(SolverProfiler.MODES)}.")
+        if mode == "cprofile":
+            return SolverProfiler._run_cprofile(function, args, kwargs, output or "solve.prof")
+        return SolverProfiler._run_sampling(function, args, kwargs, output or "solve.folded")
+
+    # static method to profile with cProfile, every function call is measured
+    @staticmethod
+    def _run_cprofile(function, args, kwargs, output):
+        profiler = cProfile.Profile()
+        result = profiler.runcall(function, *args, **kwargs)
+        profiler.dump_stats(output)
+
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats("cumulative").print_stats(20)
+        print(text.getvalue())
+        print(f"Profile written to {output}")
+        return result
+
+    # static method to profile by sampling, a background thread looks at the stack of the solving thread
+    # every SAMPLE_INTERVAL seconds, this slows the solve down much less than cProfile
+    @staticmethod
+    def _run_sampling(function, args, kwargs, output):
+        target = threading.get_ident()
+        samples = Counter()
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(SolverProfiler.SAMPLE_INTERVAL):
+                frame = sys._current_frames().get(target)
+                stack = []
+                while frame is not None:
+                    stack.append(f"{frame.f_code.co_name} ({frame.f_code.co_filename.rsplit('/', 1)[-1]}:{frame.f_code.co_firstlineno})")
+                    frame = frame.f_back
+                if stack:
+                    samples[";".join(reversed(stack))] += 1
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        try:
+            result = function(*args, **kwargs)
+        finally:
+            done.set()
+            sampler.join()
+
+        with open(output, "w") as file:
+            for stack, count in samples.most_common():
+                file.write(f"{stack} {count}\n")
+        print(f"{sum(samples.values())} samples written to {output}")
+        return result
@@ -0,0 +1,116 @@
+# this file keeps the start of the application fast and measures it
+# the heavy modules are imported in a background thread while the title card is showing, and the time
+# until the main window takes input is compared with a budget
+#
+# set BUDGET_ALLOCATION_STARTUP_REPORT=1 to print the startup times, and the slowest imports, on every start
+
+# import the necessary libraries
+import importlib
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import List, Optional, Tuple
+
+# startup timer class, the times are counted from when this module was imported (right after python started)
+class StartupTimer:
+    # seconds the main window may take to take input after pressing start
+    STARTUP_BUDGET = 1.0
+    # the heavy modules of the main window, in the order they are warmed up
+    # the gui module itself is left out since importing it changes the theme of the open title card,
+    # the chart modules come last, the main window only needs them once the charts tab is opened
+    WARM_MODULES = (
+        "numpy", "project", "project_set", "branch_and_bound", "solver", "optimizer_session",
+        "portfolio_io", "solve_cache", "matplotlib.pyplot", "matplotlib.backends.backend_tkagg", "chart_engine",
+    )
+    # how many imports the import time report lists
+    REPORTED_IMPORTS = 15
+    PROCESS_START = time.perf_counter()
+
+    # initialize the timer
+    def __init__(self):
+        self.marks = []         # (name, seconds since the process started)
+        self.warm_thread = None
+        self.warm_time = None   # seconds the background imports took, None until they are done
+
+    # remember that something happened now
+    def mark(self, name: str) -> float:
+        elapsed = time.perf_counter() - StartupTimer.PROCESS_START
+        self.marks.append((name, elapsed))
+        return elapsed
+
+    # seconds between two marks, None if one of them did not happen yet
+    def between(self, first: str, last: str) -> Optional[float]:
+        times = dict(self.marks)
+        if first not in times or last not in times:
+            return None
+        return times[last] - times[first]
+
+    # import the heavy modules in a background thread, so they are already loaded when start is pressed
+    # a module that fails to import is skipped here, the real import reports the error
+    def warm_imports(self, modules=None):
+        def warm():
+            start = time.perf_counter()
+            for module in modules or StartupTimer.WARM_MODULES:
+                try:
+                    importlib.import_module(module)
+                except Exception:
+                    pass
+            self.warm_time = time.perf_counter() - start
+
+        self.warm_thread = threading.Thread(target=warm, daemon=True)
+        self.warm_thread.start()
+
+    # check the time from pressing start to the main window taking input against the budget
+    # returns the time, or None if the main window did not open yet
+    def check_budget(self, first: str = "start pressed", last: str = "main window interactive") -> Optional[float]:
+        elapsed = self.between(first, last)
+        if elapsed is not None and elapsed > StartupTimer.STARTUP_BUDGET:
+            print(f"Startup took {elapsed:.2f} s, over the budget of {StartupTimer.STARTUP_BUDGET:.2f} s. "
+                  f"Set BUDGET_ALLOCATION_STARTUP_REPORT=1 to see the slowest imports.", file=sys.stderr)
+        return elapsed
+
+    # static method to measure how long every module takes to import, in a fresh python with -X importtime
+    # returns (module, seconds including the modules it imports), the slowest first
+    @staticmethod
+    def import_times(module: str = "budget_allocation_gui") -> List[Tuple[str, float]]:
+        directory = os.path.dirname(os.path.abspath(__file__))
+        result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                                cwd=directory, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise ImportError(f"Could not import {module}: {result.stderr.strip().splitlines()[-1]}")
+        times = []
+        for line in result.stderr.splitlines():
+            # import time: self [us] | cumulative | imported package
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times.append((name.strip(), int(cumulative) / 1e6))
+        return sorted(times, key=lambda item: item[1], reverse=True)
+
+    # the startup times as text, with the slowest imports of the main window
+    def report(self, imports: bool = True) -> str:
+        lines = ["Startup Times:"]
+        for name, elapsed in self.marks:
+            lines.append(f"  {name}: {elapsed:.3f} s after start")
+        elapsed = self.between("start pressed", "main window interactive")
+        if elapsed is not None:
+            status = "within" if elapsed <= StartupTimer.STARTUP_BUDGET else "over"
+            lines.append(f"  main window: {elapsed:.3f} s ({status} the budget of {StartupTimer.STARTUP_BUDGET:.2f} s)")
+        if self.warm_time is not None:
+            lines.append(f"  background imports: {self.warm_time:.3f} s")
+
+        if imports:
+            lines.append("Slowest Imports (fresh interpreter, including the modules they import):")
+            try:
+                for name, seconds in StartupTimer.import_times()[:StartupTimer.REPORTED_IMPORTS]:
+                    lines.append(f"  {name}: {seconds:.3f} s")
+            except ImportError as e:
+                lines.append(f"  {str(e)}")
+        return "\n".join(lines)
+
+    # static method to see if the startup report was asked for
+    @staticmethod
+    def report_requested() -> bool:
+        return os.environ.get("BUDGET_ALLOCATION_STARTUP_REPORT", "") not in ("", "0")
@@ -4,12 +4,19 @@
 import customtkinter as ctk
 from tkinter import messagebox
 
+# import the startup timer from startup_profile.py (must be in the same directory as this file)
+from startup_profile import StartupTimer
+
 # title card class
 class TitleCard:
     # initialize the gui
     def __init__(self):
         self.root = ctk.CTk()
+        self.startup = StartupTimer()
         self.setup_gui()
+        # load the main window's modules while the title card is showing
+        self.startup.warm_imports()
+        self.root.after_idle(lambda: self.startup.mark("title card interactive"))
     
     # setup the gui
     def setup_gui(self):
@@ -84,6 +91,7 @@ class TitleCard:
     # start the application
     def start_application(self):
         try:
+            self.startup.mark("start pressed")
             self.root.withdraw()  # hide the title card
             
             # import the gui file (the gui file must be in the same directory)
@@ -99,6 +107,8 @@ class TitleCard:
                 self.root.deiconify()
             
             main_root.protocol("WM_DELETE_WINDOW", on_main_close)
+            # the window takes input once tk is idle for the first time
+            main_root.after_idle(self.main_window_ready)
             main_root.mainloop()
             
         # import error handling
@@ -109,6 +119,13 @@ class TitleCard:
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
             self.root.deiconify()
     
+    # measure the startup once the main window takes input
+    def main_window_ready(self):
+        self.startup.mark("main window interactive")
+        self.startup.check_budget()
+        if StartupTimer.report_requested():
+            print(self.startup.report())
+    
     # exit the application
     def exit_application(self):
         result = messagebox.askyesno("Confirm Exit", 
@@ -0,0 +1,133 @@
+# this file keeps a ttk treeview in sync with a list of projects without rebuilding it every time
+# every row is keyed by the project id, so a refresh only inserts, deletes and updates the rows that changed
+# for very long lists only the rows that fit in the window are kept in the treeview
+
+# virtual table class
+class VirtualTable:
+    # lists longer than this are rendered one window of rows at a time
+    VIRTUAL_THRESHOLD = 1000
+    # estimated height of a treeview row in pixels, used to know how many rows fit
+    ROW_HEIGHT = 20
+    # extra rows rendered below the visible ones
+    OVERSCAN = 5
+
+    # initialize the table, format_row turns a project into the tuple of column values
+    def __init__(self, tree, scrollbar, format_row):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.format_row = format_row
+        self.items = []         # every project in display order
+        self.by_key = {}        # row key -> project
+        self.rendered = {}      # row key -> values currently shown in the treeview
+        self.first = 0          # index of the first rendered project when the list is virtual
+
+        # the scrollbar talks to the table, the table decides if the treeview scrolls itself
+        self.scrollbar.configure(command=self.yview)
+        self.tree.configure(yscrollcommand=self.tree_scrolled)
+        self.tree.bind("<MouseWheel>", self.on_mouse_wheel)
+        self.tree.bind("<Button-4>", self.on_mouse_wheel)
+        self.tree.bind("<Button-5>", self.on_mouse_wheel)
+        self.tree.bind("<Configure>", lambda event: self.is_virtual() and self.render())
+
+    # the key of the row that shows a project
+    @staticmethod
+    def row_key(project):
+        return str(project.project_id)
+
+    # is the list long enough to only render the visible rows
+    def is_virtual(self):
+        return len(self.items) > self.VIRTUAL_THRESHOLD
+
+    # how many rows fit in the treeview right now
+    def window_size(self):
+        visible = max(self.tree.winfo_height() // self.ROW_HEIGHT, int(self.tree.cget('height')))
+        return visible + self.OVERSCAN
+
+    # show a new list of projects, only the rows that changed are touched
+    def sync(self, projects):
+        self.items = list(projects)
+        self.by_key = {self.row_key(project): project for project in self.items}
+        self.first = min(self.first, max(len(self.items) - self.window_size(), 0))
+        self.render()
+
+    # refresh the rows of the given projects, e.g. after their priority changed
+    def refresh(self, projects=None):
+        for project in projects if projects is not None else self.items:
+            key = self.row_key(project)
+            if key in self.rendered:
+                values = self.format_row(project)
+                if values != self.rendered[key]:
+                    self.tree.item(key, values=values)
+                    self.rendered[key] = values
+
+    # the project of the selected row, or None if no row is selected
+    def selected_item(self):
+        selection = self.tree.selection()
+        if not selection:
+            return None
+        return self.by_key.get(selection[0])
+
+    # bring the treeview in line with the projects that should be visible
+    def render(self):
+        if self.is_virtual():
+            visible = self.items[self.first:self.first + self.window_size()]
+        else:
+            visible = self.items
+        wanted = [self.row_key(project) for project in visible]
+        wanted_keys = set(wanted)
+
+        # delete the rows that are no longer shown
+        stale = [key for key in self.rendered if key not in wanted_keys]
+        if stale:
+            self.tree.delete(*stale)
+            for key in stale:
+                del self.rendered[key]
+
+        # insert the new rows and update the ones whose values changed
+        for index, (key, project) in enumerate(zip(wanted, visible)):
+            values = self.format_row(project)
+            if key not in self.rendered:
+                self.tree.insert('', index, iid=key, values=values)
+            elif values != self.rendered[key]:
+                self.tree.item(key, values=values)
+            self.rendered[key] = values
+
+        # move the rows only if the order changed
+        children = self.tree.get_children()
+        if list(children) != wanted:
+            for index, key in enumerate(wanted):
+                self.tree.move(key, '', index)
+
+        if self.is_virtual():
+            total = len(self.items)
+            self.scrollbar.set(self.first / total, min((self.first + len(visible)) / total, 1))
+
+    # scrollbar callback, in virtual mode the window of rows moves instead of the treeview
+    def yview(self, *args):
+        if not self.is_virtual():
+            return self.tree.yview(*args)
+
+        window = self.window_size()
+        last_first = max(len(self.items) - window, 0)
+        if args[0] == 'moveto':
+            first = int(float(args[1]) * len(self.items))
+        else:
+            step = int(args[1])
+            first = self.first + (step * window if args[2] == 'pages' else step)
+        self.first = min(max(first, 0), last_first)
+        self.render()
+
+    # treeview callback, only used when the treeview holds every row
+    def tree_scrolled(self, low, high):
+        if not self.is_virtual():
+            self.scrollbar.set(low, high)
+
+    # scroll the window of rows with the mouse wheel
+    def on_mouse_wheel(self, event):
+        if not self.is_virtual():
+            return None
+        if event.num == 4 or getattr(event, 'delta', 0) > 0:
+            self.yview('scroll', -3, 'units')
+        else:
+            self.yview('scroll', 3, 'units')
+        return "break"